@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from rate_limit import TokenBucket
+
+MAX_ACTIVE_RUNS = int(os.getenv("RESEARCH_MAX_ACTIVE_RUNS", 2))
+MAX_QUEUED_RUNS = int(os.getenv("RESEARCH_MAX_QUEUED_RUNS", 20))
+USER_RUNS_PER_HOUR = float(os.getenv("RESEARCH_USER_RUNS_PER_HOUR", 12))
+USER_BURST = float(os.getenv("RESEARCH_USER_BURST", 3))
+# Set only behind a reverse proxy or auth layer that sets the user and forwarded-address
+# headers itself; otherwise clients could pick any user by sending those headers
+TRUSTED_PROXY = os.getenv("RESEARCH_TRUSTED_PROXY", "").lower() in ("1", "true", "yes")
+
+# Lower numbers are admitted first
+INTERACTIVE = 0
+BATCH = 10
+
+
+class AdmissionRejected(RuntimeError):
+    """A run was refused because its user is over their rate or the queue is full"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Process-wide gate in front of research runs
+
+    Each user draws from their own token bucket when a run is submitted, so one user
+    cannot take every slot. Admitted runs then wait for one of max_active slots, in
+    priority order and first come first served within a priority.
+    """
+
+    def __init__(self, max_active=MAX_ACTIVE_RUNS, max_queued=MAX_QUEUED_RUNS,
+                 user_rate=USER_RUNS_PER_HOUR / 3600, user_burst=USER_BURST):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.active = 0
+        self.peak_active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self._buckets = {}
+        self._waiting = []
+        self._order = itertools.count()
+        self._changed = threading.Condition()
+
+    def check(self, user):
+        """Charge one run to user, raising AdmissionRejected if they are over rate or the queue is full"""
+        with self._changed:
+            if len(self._waiting) >= self.max_queued:
+                self.rejected += 1
+                raise AdmissionRejected(f"{len(self._waiting)} research runs are already waiting; try again shortly")
+            bucket = self._buckets.get(user)
+            if bucket is None:
+                bucket = self._buckets[user] = TokenBucket(self.user_rate, capacity=self.user_burst)
+        if not bucket.try_acquire():
+            retry_after = bucket.wait_time()
+            with self._changed:
+                self.rejected += 1
+            raise AdmissionRejected(f"Research limit reached; try again in {retry_after / 60:.0f} min",
+                                    retry_after=retry_after)
+
+    @contextmanager
+    def slot(self, priority=INTERACTIVE):
+        """Hold one of the active run slots for the duration of the block"""
+        start = time.monotonic()
+        entry = (priority, next(self._order))
+        with self._changed:
+            heapq.heappush(self._waiting, entry)
+            while self._waiting[0] != entry or self.active >= self.max_active:
+                self._changed.wait()
+            heapq.heappop(self._waiting)
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            self.admitted += 1
+            self.wait_seconds += time.monotonic() - start
+            self._changed.notify_all()
+        try:
+            yield
+        finally:
+            with self._changed:
+                self.active -= 1
+                self._changed.notify_all()
+
+    def stats(self):
+        with self._changed:
+            depth = defaultdict(int)
+            for priority, _ in self._waiting:
+                depth[priority] += 1
+            return {
+                "active": self.active,
+                "max_active": self.max_active,
+                "peak_active": self.peak_active,
+                "queued": len(self._waiting),
+                "queued_by_priority": dict(sorted(depth.items())),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "mean_wait_seconds": self.wait_seconds / self.admitted if self.admitted else 0.0,
+            }
+
+
+_shared_controller = None
+_shared_lock = threading.Lock()
+
+
+def get_admission_controller():
+    """Return the process-wide admission controller"""
+    global _shared_controller
+    with _shared_lock:
+        if _shared_controller is None:
+            _shared_controller = AdmissionController()
+        return _shared_controller
@@ -0,0 +1,169 @@
+import functools
+import os
+import threading
+import time
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+from search_cache import HTTP_POOL_SIZE
+
+MAX_IDLE_CREWS = int(os.getenv("AGENT_POOL_MAX_IDLE", 4))
+
+# Attributes a Crew run writes onto its agents; restored before an agent goes back to the pool
+_RUN_STATE = ("crew", "step_callback", "function_calling_llm", "allow_delegation")
+
+
+class ResearchConfig(namedtuple("ResearchConfig", ["model", "openai_key", "serper_key"], defaults=(None, None))):
+    """Model and API keys of one session, handed to its agents instead of set in os.environ
+
+    Keys left as None fall back to the OPENAI_API_KEY and SERPER_API_KEY environment variables.
+    """
+    __slots__ = ()
+
+    def __repr__(self):
+        return f"ResearchConfig(model={self.model!r})"
+
+
+@functools.lru_cache(maxsize=None)
+def shared_llm(model, api_key=None):
+    """One cached LLM client per model and key, shared by every pooled agent"""
+    from llm_cache import cached_llm
+
+    configure_http_pool()
+    return cached_llm(model, api_key=api_key)
+
+
+@functools.lru_cache(maxsize=None)
+def shared_search_tool(api_key=None):
+    from search_cache import cached_search_tool
+
+    return cached_search_tool(api_key=api_key)
+
+
+@functools.lru_cache(maxsize=None)
+def configure_http_pool(size=HTTP_POOL_SIZE):
+    """Route litellm's OpenAI-compatible clients through one keep-alive connection pool"""
+    try:
+        import httpx
+        import litellm
+    except ImportError:
+        return
+    limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+    if litellm.client_session is None:
+        litellm.client_session = httpx.Client(limits=limits)
+    if litellm.aclient_session is None:
+        litellm.aclient_session = httpx.AsyncClient(limits=limits)
+
+
+def build_agents(config):
+    from crew_factory import setup_agents
+
+    return setup_agents(config.model, llm=shared_llm(config.model, config.openai_key),
+                        search_tool=shared_search_tool(config.serper_key))
+
+
+class AgentPool:
+    """Process-wide pool of prebuilt (researcher, visualizer, writer) crews keyed by ResearchConfig.
+
+    Each acquire hands out a crew exclusively, so concurrent sessions never share
+    an agent mid-run; crews built for the same config share LLM clients and the
+    search tool.
+    """
+
+    def __init__(self, factory=build_agents, max_idle=MAX_IDLE_CREWS):
+        self.factory = factory
+        self.max_idle = max_idle
+        self.created = 0
+        self.reused = 0
+        self.build_seconds = 0.0
+        self.last_setup_seconds = 0.0
+        self._idle = defaultdict(list)
+        self._baseline = {}
+        self._warming = set()
+        self._lock = threading.Lock()
+
+    def _build(self, config):
+        start = time.perf_counter()
+        agents = self.factory(config)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.created += 1
+            self.build_seconds += elapsed
+            for agent in agents:
+                self._baseline[id(agent)] = {name: getattr(agent, name, None) for name in _RUN_STATE}
+        return agents
+
+    def _reset(self, agents):
+        for agent in agents:
+            for name, value in self._baseline.get(id(agent), {}).items():
+                setattr(agent, name, value)
+            if hasattr(agent, "tools_results"):
+                agent.tools_results = []
+
+    def warm(self, config, count=1):
+        """Prebuild crews for config so the first request finds them idle"""
+        for _ in range(count):
+            agents = self._build(config)
+            self.release(config, agents)
+
+    def warm_in_background(self, config, count=1):
+        """Start warming config once per process; later calls are no-ops"""
+        with self._lock:
+            if config in self._warming:
+                return None
+            self._warming.add(config)
+        thread = threading.Thread(target=self.warm, args=(config, count), daemon=True)
+        thread.start()
+        return thread
+
+    def acquire(self, config):
+        start = time.perf_counter()
+        with self._lock:
+            agents = self._idle[config].pop() if self._idle[config] else None
+            if agents is not None:
+                self.reused += 1
+        if agents is None:
+            agents = self._build(config)
+        self.last_setup_seconds = time.perf_counter() - start
+        return agents
+
+    def release(self, config, agents):
+        self._reset(agents)
+        with self._lock:
+            if len(self._idle[config]) < self.max_idle:
+                self._idle[config].append(agents)
+            else:
+                for agent in agents:
+                    self._baseline.pop(id(agent), None)
+
+    @contextmanager
+    def agents(self, config):
+        """Borrow a crew of agents for one request and return it to the pool afterwards"""
+        agents = self.acquire(config)
+        try:
+            yield agents
+        finally:
+            self.release(config, agents)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "created": self.created,
+                "reused": self.reused,
+                "idle": sum(len(crews) for crews in self._idle.values()),
+                "build_seconds": self.build_seconds,
+                "last_setup_seconds": self.last_setup_seconds,
+            }
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_agent_pool():
+    """Return the process-wide agent pool"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = AgentPool()
+        return _shared_pool
@@ -1,5 +1,6 @@
 import sys
 import streamlit as st
+import streamlit.components.v1 as components
 import os
 from dotenv import load_dotenv
 
@@ -9,19 +10,27 @@ try:
 except ImportError:
     pass
 
-from crewai import Agent, Task, Crew, Process
-from crewai_tools import SerperDevTool
+import html
 import json
+import uuid
 from datetime import datetime
-import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
-import base64
 from io import BytesIO
-import tempfile
-import time
-import re
-from streamlit_mermaid import st_mermaid
+from search_cache import get_search_cache
+from llm_cache import get_llm_cache
+from page_fetch import get_page_fetcher
+from streaming import FinalAnswerBuffer
+from crew_factory import WRITER_ROLE
+from artifact_cache import content_key, get_artifact_cache
+from citations import get_citation_service
+from report_parser import parse_report, render_blocks, stable_prefix_length, tokenize
+from research import generate_report
+from agent_pool import ResearchConfig, get_agent_pool
+from telemetry import summarize_trace
+from jobs import DONE, FAILED, get_job_queue
+from admission import INTERACTIVE, TRUSTED_PROXY, AdmissionRejected
+from report_store import get_report_store
+
+LARGE_GRAPH_NODES = 200
 
 if 'api_keys_set' not in st.session_state:
     st.session_state.api_keys_set = False
@@ -80,17 +89,12 @@ class VisualizationTools:
     @staticmethod
     def extract_mermaid_diagrams(markdown_content):
         """Extract Mermaid diagrams from markdown content"""
-        pattern = r"```mermaid\n(.*?)```"
-        return re.findall(pattern, markdown_content, re.DOTALL)
+        return parse_report(markdown_content).mermaid_diagrams
 
     @staticmethod
     def extract_latex_equations(markdown_content):
         """Extract LaTeX equations from markdown content"""
-        inline_pattern = r"\$([^\$]+)\$"
-        block_pattern = r"\$\$(.*?)\$\$"
-        inline_matches = re.findall(inline_pattern, markdown_content)
-        block_matches = re.findall(block_pattern, markdown_content, re.DOTALL)
-        return {"inline": inline_matches, "block": block_matches}
+        return parse_report(markdown_content).latex_equations
 
     @staticmethod
     def render_mermaid_diagram(diagram_code, key=None):
@@ -100,7 +104,9 @@ class VisualizationTools:
             diagram_code = diagram_code[10:].strip()
         if diagram_code.endswith("```"):
             diagram_code = diagram_code[:-3].strip()
-        st_mermaid(diagram_code, key=key)
+        from streamlit_mermaid import st_mermaid
+        # Content-addressed keys let the front end keep an unchanged diagram mounted across reruns
+        st_mermaid(diagram_code, key=f"{key or 'mermaid'}_{content_key(diagram_code)[:12]}")
 
     @staticmethod
     def render_latex(equation, block=False, key=None):
@@ -111,213 +117,270 @@ class VisualizationTools:
             st.markdown(f"${equation}$")
 
     @staticmethod
-    def create_relationship_graph(nodes, edges):
+    def create_relationship_graph(nodes, edges, format='png'):
+        """Draw a relationship graph, reusing the cached image for identical inputs"""
+        key = content_key("relationship_graph", list(nodes), [list(edge) for edge in edges], format)
+        data = get_artifact_cache().get_or_create(
+            key, lambda: VisualizationTools._draw_relationship_graph(nodes, edges, format))
+        return BytesIO(data)
+
+    @staticmethod
+    def _draw_relationship_graph(nodes, edges, format):
+        import networkx as nx
+        from matplotlib.figure import Figure
+        from graph_layout import layout_graph
+
         G = nx.Graph()
         G.add_nodes_from(nodes)
         G.add_edges_from(edges)
-        plt.figure(figsize=(12, 8))
-        nx.draw(G, with_labels=True, node_color='lightblue', 
+        pos = None
+        if G.number_of_nodes() > LARGE_GRAPH_NODES:
+            layout = layout_graph(list(G.nodes), list(G.edges), aggregate=False)
+            pos = dict(zip(layout["names"], layout["pos"]))
+        fig = Figure(figsize=(12, 8))
+        nx.draw(G, pos=pos, ax=fig.add_subplot(), with_labels=True, node_color='lightblue', 
                 node_size=1500, font_size=10, font_weight='bold')
         
         buf = BytesIO()
-        plt.savefig(buf, format='png')
-        plt.close()
-        buf.seek(0)
-        return buf
+        fig.savefig(buf, format=format)
+        return buf.getvalue()
+
+    @staticmethod
+    def create_interactive_graph(nodes, edges, weights=None, max_edges=None, aggregate=None):
+        """Lay out a large relationship graph and return it as an interactive HTML canvas"""
+        from graph_layout import graph_html, layout_graph
+
+        key = content_key("interactive_graph", list(nodes), [list(edge) for edge in edges],
+                          None if weights is None else list(weights), max_edges, aggregate)
+        data = get_artifact_cache().get_or_create(
+            key, lambda: graph_html(layout_graph(nodes, edges, weights, max_edges, aggregate)).encode("utf-8"))
+        return data.decode("utf-8")
+
+    @staticmethod
+    def render_interactive_graph(html_content, height=600):
+        """Render an interactive graph produced by create_interactive_graph"""
+        components.html(html_content, height=height + 10)
 
 class ResearchTools:
     def __init__(self):
-        self.search_tool = SerperDevTool()
+        from search_cache import cached_search_tool
+
+        self.search_tool = cached_search_tool()
 
     def fetch_citations(self, query):
         try:
-            from scholarly import scholarly
-            search_query = scholarly.search_pubs(query)
-            citations = []
-            try:
-                for i in range(5): 
-                    pub = next(search_query)
-                    citations.append({
-                        'title': pub.bib.get('title', ''),
-                        'author': pub.bib.get('author', ''),
-                        'year': pub.bib.get('year', '')
-                    })
-            except StopIteration:
-                pass
-            return citations
+            return get_citation_service().fetch(query, limit=5)
         except ImportError:
             st.warning("The 'scholarly' package is not installed. Citations cannot be fetched.")
             return []
 
+def read_api_keys():
+    """Read API keys from Streamlit secrets, raising if they are missing"""
+    return (st.secrets["SERPER_API_KEY"], st.secrets["OPENAI_API_KEY"],
+            st.secrets.get("OPENAI_MODEL", "gpt-4o-mini"))
+
 def get_api_keys():
     """Get API keys from Streamlit secrets"""
     try:
-        serper_key = st.secrets["SERPER_API_KEY"]
-        openai_key = st.secrets["OPENAI_API_KEY"]
-        openai_model = st.secrets.get("OPENAI_MODEL", "gpt-4o-mini")
+        serper_key, openai_key, openai_model = read_api_keys()
         st.session_state.api_keys_set = True
         return serper_key, openai_key, openai_model
     except Exception:
         st.session_state.api_keys_set = False
         return "", "", "gpt-4o-mini"
 
-def setup_agents():
-    """Setup and return the agents required for the research"""
-    researcher = Agent(
-        role='Senior Research Analyst',
-        goal='Conduct comprehensive research and create detailed analysis with visualizations',
-        verbose=True,
-        memory=True,
-        backstory="""You are an elite research analyst with expertise in creating 
-        comprehensive reports with data visualization. You excel at identifying patterns,
-        creating relationships between concepts, and presenting information in an 
-        engaging and visually appealing manner.""",
-        tools=[SerperDevTool()],
-        allow_delegation=True
-    )
-
-    visualizer = Agent(
-        role='Data Visualization Specialist',
-        goal='Create compelling visualizations and diagrams from research data',
-        verbose=True,
-        memory=True,
-        backstory="""You specialize in transforming complex data into clear, 
-        visually appealing diagrams and charts. You have expertise in creating 
-        mermaid diagrams, relationship graphs, and other visual representations.""",
-        tools=[SerperDevTool()],
-        allow_delegation=False
-    )
-
-    writer = Agent(
-        role='Technical Writer',
-        goal='Create comprehensive and well-structured technical documentation',
-        verbose=True,
-        memory=True,
-        backstory="""You are an experienced technical writer who excels at 
-        creating clear, engaging, and well-organized documentation. You know 
-        how to present complex information in an accessible format.""",
-        tools=[SerperDevTool()],
-        allow_delegation=False
-    )
-    
-    return researcher, visualizer, writer
-
-def create_research_tasks(topic, researcher, visualizer, writer):
-    """Create and return the tasks for the research crew"""
-    research_task = Task(
-        description=f"""Conduct comprehensive research on {topic}. Include:
-        1. Latest developments and trends
-        2. Key players and technologies
-        3. Market analysis and future predictions
-        4. Potential challenges and solutions
-        5. Related research papers and citations
-        
-        Format the findings in a structured JSON format for visualization.""",
-        agent=researcher,
-        expected_output="Detailed research findings in JSON format"
-    )
-
-    visualization_task = Task(
-        description=f"""Create visual representations for the research on {topic}:
-        1. Generate a mermaid diagram showing the relationship between key concepts
-        2. Create a relationship graph of key players and technologies
-        3. Design a timeline of developments
-        4. Visualize market trends and predictions""",
-        agent=visualizer,
-        expected_output="A collection of visual elements in markdown format"
-    )
-
-    writing_task = Task(
-        description=f"""Create a comprehensive report on {topic} including:
-        1. Executive Summary
-        2. Detailed Analysis
-        3. Visual Elements
-        4. Citations and References
-        5. Future Outlook
-        
-        Format the report in markdown with clear sections and styling.""",
-        agent=writer,
-        expected_output="A complete markdown report with all elements integrated",
-        output_file=f"research_report_{datetime.now().strftime('%Y%m%d')}.md"
-    )
-
-    return [research_task, visualization_task, writing_task]
-
-def generate_report(topic, status_placeholder, serper_key, openai_key, openai_model):
-    """Generate a research report on the given topic"""
-    os.environ["SERPER_API_KEY"] = serper_key
-    os.environ["OPENAI_API_KEY"] = openai_key
-    os.environ["OPENAI_MODEL"] = openai_model
-    
-    researcher, visualizer, writer = setup_agents()
-    
-    tasks = create_research_tasks(topic, researcher, visualizer, writer)
-    
-    crew = Crew(
-        agents=[researcher, visualizer, writer],
-        tasks=tasks,
-        process=Process.sequential,
-        verbose=True 
-    )
+def render_report_section(idx, section_type, content):
+    """Render a single report block"""
+    section_container = st.container()
     
-    status_placeholder.markdown('<p class="status progress">Starting the research process...</p>', unsafe_allow_html=True)
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        output_file = os.path.join(temp_dir, f"research_report_{datetime.now().strftime('%Y%m%d')}.md")
-        tasks[-1].output_file = output_file
-        
-        status_placeholder.markdown('<p class="status progress">Research in progress...</p>', unsafe_allow_html=True)
-        result = crew.kickoff(inputs={'topic': topic})
-        
-        if os.path.exists(output_file):
-            with open(output_file, 'r') as f:
-                report_content = f.read()
+    with section_container:
+        if section_type == "mermaid":
+            VisualizationTools.render_mermaid_diagram(content, key=f"report_mermaid_{idx}")
+        elif section_type == "latex":
+            VisualizationTools.render_latex(content, block=True)
         else:
-            report_content = result
-    
-    status_placeholder.markdown('<p class="status success">Research completed successfully!</p>', unsafe_allow_html=True)
-    
-    return report_content
+            st.markdown(content, unsafe_allow_html=True)
 
 def render_report_with_visualizations(report_content):
     """Render the report content with compiled visualizations"""
-    sections = []
-    current_pos = 0
-    
-    mermaid_matches = list(re.finditer(r"```mermaid.*?```", report_content, re.DOTALL))
-    latex_matches = list(re.finditer(r"\$\$.*?\$\$", report_content, re.DOTALL))
+    for idx, (section_type, content) in enumerate(parse_report(report_content).blocks):
+        render_report_section(idx, section_type, content)
+
+def render_performance(spans):
+    """Show totals and a per-stage waterfall for the trace of the last run"""
+    summary = summarize_trace(spans)
+    cols = st.columns(4)
+    cols[0].metric("Wall time", f"{summary['wall_seconds']:.1f} s")
+    cols[1].metric("LLM calls", summary['llm_calls'], f"{summary['llm_cache_hits']} cached", delta_color="off")
+    cols[2].metric("Tokens", f"{summary['prompt_tokens'] + summary['completion_tokens']:,}",
+                   f"${summary['cost_usd']:.4f} est.", delta_color="off")
+    cols[3].metric("Tool calls", summary['tool_calls'], f"{summary['retries']} retries", delta_color="off")
     
-    all_matches = sorted(mermaid_matches + latex_matches, key=lambda x: x.start())
+    origin = min(span["start_time_unix_nano"] for span in spans)
+    rows = [{
+        "span": f"{i:03d} {span['kind']}: {span['name']}",
+        "kind": span["kind"],
+        "start": (span["start_time_unix_nano"] - origin) / 1e9,
+        "end": (span["end_time_unix_nano"] - origin) / 1e9,
+        "duration_ms": round(span["duration_ms"], 1),
+        "detail": json.dumps(span["attributes"], default=str)[:200],
+    } for i, span in enumerate(sorted(spans, key=lambda span: span["start_time_unix_nano"]))]
+    st.vega_lite_chart({
+        "data": {"values": rows},
+        "mark": {"type": "bar", "tooltip": True},
+        "height": max(200, 18 * len(rows)),
+        "encoding": {
+            "y": {"field": "span", "type": "ordinal", "sort": None, "axis": {"title": None}},
+            "x": {"field": "start", "type": "quantitative", "title": "seconds"},
+            "x2": {"field": "end"},
+            "color": {"field": "kind", "type": "nominal"},
+            "tooltip": [{"field": "span"}, {"field": "duration_ms"}, {"field": "detail"}],
+        },
+    }, use_container_width=True)
     
-    for match in all_matches:
-        if match.start() > current_pos:
-            sections.append(("text", report_content[current_pos:match.start()]))
-        
-        content = match.group()
-        if content.startswith("```mermaid"):
-            sections.append(("mermaid", content))
+    stages = [row for row in rows if row["kind"] in ("stage", "task")]
+    if stages:
+        st.dataframe([{key: row[key] for key in ("span", "duration_ms", "detail")} for row in stages],
+                     use_container_width=True)
+    st.download_button("📥 Download Trace (JSONL)", "\n".join(json.dumps(span) for span in spans),
+                       file_name=f"trace_{spans[0]['trace_id']}.jsonl", mime="application/jsonl")
+
+class IncrementalReportRenderer:
+    """Render a growing report, drawing each section once as soon as it is complete"""
+
+    def __init__(self, container):
+        self.placeholder = container.empty()
+        self.container = self.placeholder.container()
+        self.text = ""
+        self.rendered_upto = 0
+        self.section_count = 0
+
+    def _render(self, chunk):
+        with self.container:
+            for section_type, content in render_blocks(tokenize(chunk)[0]):
+                render_report_section(self.section_count, section_type, content)
+                self.section_count += 1
+
+    def update(self, text):
+        """Render newly completed sections of the full text seen so far"""
+        if not text.startswith(self.text[:self.rendered_upto]):
+            return
+        self.text = text
+        pending = text[self.rendered_upto:]
+        safe = stable_prefix_length(pending)
+        if safe:
+            self._render(pending[:safe])
+            self.rendered_upto += safe
+
+    def append(self, section):
+        self.update(self.text + section.rstrip() + "\n\n")
+
+    def finish(self, report_content):
+        """Render whatever is left, or redraw once if the final report differs from the stream"""
+        if report_content.startswith(self.text[:self.rendered_upto]):
+            self.text = report_content
+            self._render(report_content[self.rendered_upto:])
         else:
-            sections.append(("latex", content))
-        
-        current_pos = match.end()
+            self.container = self.placeholder.container()
+            self._render(report_content)
+        self.rendered_upto = len(report_content)
+
+def run_research_job(topic, progress, model, parallel=False, max_concurrency=3, include_citations=False,
+                     research_depth=3, run_id=None, refresh=False):
+    """Job queue runner; keys are read here rather than stored with the job
+
+    The job id is the run id, so a resumed job skips the tasks it already completed.
+    """
+    try:
+        serper_key, openai_key, _ = read_api_keys()
+    except Exception:
+        serper_key, openai_key = os.getenv("SERPER_API_KEY"), os.getenv("OPENAI_API_KEY")
+    config = ResearchConfig(model, openai_key or None, serper_key or None)
+    return generate_report(topic, progress, config, parallel=parallel,
+                           max_concurrency=max_concurrency, include_citations=include_citations,
+                           research_depth=research_depth, run_id=run_id, refresh=refresh)
+
+def follow_job(job_id, status_placeholder, progress_log, renderer):
+    """Draw a queued job's progress as events arrive, then return the finished job
+
+    Jobs started by this process replay their full event log, so a refreshed page picks
+    up where it was; otherwise the stored job is polled until it finishes.
+    """
+    queue = get_job_queue(run_research_job)
+    job = queue.get(job_id)
+    if job is None:
+        raise RuntimeError(f"Unknown research job {job_id}")
+    parallel = job["params"].get("parallel", False)
+    progress = queue.progress(job_id)
     
-    if current_pos < len(report_content):
-        sections.append(("text", report_content[current_pos:]))
+    writer_output = FinalAnswerBuffer()
+    for event in progress.events() if progress is not None else ():
+        if event.kind == "status":
+            status_placeholder.markdown(event.content, unsafe_allow_html=True)
+        elif event.kind == "step":
+            status_placeholder.markdown(f'<p class="status progress">{html.escape(event.agent)}: '
+                                        f'{html.escape(event.content)}</p>', unsafe_allow_html=True)
+        elif event.kind == "task":
+            with progress_log:
+                st.markdown(f"**{event.agent}** completed its task")
+                st.markdown(event.content)
+        elif event.kind == "section":
+            renderer.append(event.content)
+        elif event.kind == "llm_start" and event.agent == WRITER_ROLE:
+            writer_output.reset()
+        elif event.kind == "token" and not parallel and event.agent == WRITER_ROLE:
+            writer_output.feed(event.content)
+            renderer.update(writer_output.answer)
     
-    for idx, (section_type, content) in enumerate(sections):
-        display_id = f"section_{idx}"
-        
-        section_container = st.container()
+    if job["status"] not in (DONE, FAILED):
+        status_placeholder.markdown(f'<p class="status progress">Waiting for research job {job_id}...</p>',
+                                    unsafe_allow_html=True)
+    job = queue.wait(job_id)
+    if job["status"] == FAILED:
+        raise RuntimeError(job["error"])
+    
+    findings = job["artifacts"].get("findings")
+    if findings is not None:
+        from findings import ResearchFindings
         
-        with section_container:
-            if section_type == "mermaid":
-                VisualizationTools.render_mermaid_diagram(content, key=f"report_mermaid_{idx}")
-            elif section_type == "latex":
-                equation = content[2:-2].strip()
-                VisualizationTools.render_latex(equation, block=True)
-            else:
-                content = re.sub(r"\$([^\$]+)\$", r"\\(\1\\)", content)
-                st.markdown(content, unsafe_allow_html=True)
+        findings = ResearchFindings.model_validate(findings)
+    st.session_state.research_findings = findings
+    st.session_state.research_trace = job["artifacts"].get("trace")
+    return job
+
+def session_user():
+    """Identify the user for per-user admission limits
+
+    Their login if any, else the client address forwarded by a trusted reverse proxy
+    (only with RESEARCH_TRUSTED_PROXY set, since clients can send those headers
+    themselves), else a session id kept in the page URL so a reload keeps drawing from
+    the same bucket. The last can be dropped by opening the app without it, so
+    deployments that need a hard per-user limit should sit behind a login or a proxy.
+    """
+    try:
+        email = st.experimental_user.get("email")
+    except Exception:
+        email = None
+    if email:
+        return email
+    if TRUSTED_PROXY:
+        forwarded = st.context.headers.get("X-Forwarded-For") or st.context.headers.get("X-Real-Ip")
+        if forwarded:
+            return f"client-{forwarded.split(',')[0].strip()}"
+    if "session_user" not in st.session_state:
+        st.session_state.session_user = st.query_params.get("sid") or uuid.uuid4().hex[:12]
+    st.query_params["sid"] = st.session_state.session_user
+    return f"session-{st.session_state.session_user}"
+
+def render_past_reports():
+    """Full-text search over stored reports, showing matching sections"""
+    store = get_report_store()
+    query = st.text_input("Search past reports", placeholder="E.g., solid-state batteries market")
+    for i, hit in enumerate(store.search(query)):
+        updated = datetime.fromtimestamp(hit["updated_at"]).strftime('%Y-%m-%d')
+        st.markdown(f"**{hit['topic']}** — {hit['heading'] or 'Introduction'} ({updated})  \n{' '.join(hit['snippet'].split())}")
+        if st.toggle("Show report", key=f"past_report_{hit['report_id']}_{i}"):
+            st.markdown(store.get(hit["report_id"]).content)
 
 def main():
     st.markdown('<h1 class="main-header">🔍 Advanced Research Assistant</h1>', unsafe_allow_html=True)
@@ -345,9 +408,37 @@ def main():
     
     st.sidebar.markdown('<h2 class="sub-header">Research Settings</h2>', unsafe_allow_html=True)
     research_depth = st.sidebar.slider("Research Depth", min_value=1, max_value=5, value=3,
-                                     help="Higher values produce more detailed reports but take longer")
+                                     help="Higher values give each agent a larger context budget: more detailed reports, more tokens and time")
     include_visualizations = st.sidebar.toggle("Include Visualizations", value=True)
     include_citations = st.sidebar.toggle("Include Citations", value=True)
+    parallel_research = st.sidebar.toggle("Parallel Research", value=False,
+                                          help="Research subtopics concurrently to cut wall-clock time")
+    max_concurrency = st.sidebar.slider("Parallel Agents", min_value=1, max_value=8, value=3,
+                                        disabled=not parallel_research)
+    refresh_report = st.sidebar.toggle("Refresh Stored Report", value=False,
+                                       help="Research every section again instead of reusing a recent report on this topic")
+    cache_stats = get_search_cache().stats()
+    st.sidebar.caption(f"Search cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                       f"{cache_stats['entries']} stored results")
+    page_stats = get_page_fetcher().stats()
+    st.sidebar.caption(f"Result pages: {page_stats['fetched']} fetched, {page_stats['cached']} cached, "
+                       f"{page_stats['duplicates']} duplicates dropped")
+    llm_stats = get_llm_cache().stats()
+    st.sidebar.caption(f"LLM cache: {llm_stats['exact_hits'] + llm_stats['semantic_hits']} hits / "
+                       f"{llm_stats['misses']} misses")
+    agent_pool = get_agent_pool()
+    agent_pool.warm_in_background(ResearchConfig(openai_model, openai_key, serper_key))
+    pool_stats = agent_pool.stats()
+    st.sidebar.caption(f"Agent pool: {pool_stats['created']} built, {pool_stats['reused']} reused, "
+                       f"last setup {pool_stats['last_setup_seconds'] * 1000:.1f} ms")
+    job_queue = get_job_queue(run_research_job)
+    job_stats = job_queue.stats()
+    admission_stats = job_queue.admission.stats()
+    st.sidebar.caption(f"Research jobs: {job_stats['running']} running, {job_stats['queued']} queued, "
+                       f"{job_stats['done']} done; {admission_stats['active']}/{admission_stats['max_active']} "
+                       f"run slots busy, {admission_stats['rejected']} turned away")
+    store_stats = get_report_store().stats()
+    st.sidebar.caption(f"Report store: {store_stats['reports']} reports, {store_stats['sections']} sections")
     
     col1, col2 = st.columns([2, 1])
     
@@ -383,25 +474,48 @@ def main():
     
     status_placeholder = st.empty()
     
+    job_id = st.query_params.get("job")
     if st.button("🚀 Start Research", disabled=not topic):
+        try:
+            job_id = job_queue.submit(final_topic, user=session_user(), priority=INTERACTIVE, model=openai_model,
+                                      parallel=parallel_research, max_concurrency=max_concurrency,
+                                      include_citations=include_citations, research_depth=research_depth,
+                                      refresh=refresh_report)
+            st.query_params["job"] = job_id
+        except AdmissionRejected as e:
+            st.warning(f"⏳ {e}")
+    
+    if job_id:
         report_container = st.container()
         
+        with report_container:
+            st.markdown('<h2 class="sub-header">Research Report</h2>', unsafe_allow_html=True)
+            progress_log = st.expander("🧭 Agent Progress", expanded=False)
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["Rendered Report", "Visualizations", "Equations",
+                                                    "Markdown Source", "Performance"])
+        
+        renderer = IncrementalReportRenderer(tab1)
+        
         with st.spinner("Research in progress... This may take several minutes."):
             try:
-                report_content = generate_report(final_topic, status_placeholder,
-                                              serper_key, openai_key, openai_model)
+                report_content = follow_job(job_id, status_placeholder, progress_log, renderer)["result"]
+                renderer.finish(report_content)
                 
                 with report_container:
-                    st.markdown('<h2 class="sub-header">Research Report</h2>', unsafe_allow_html=True)
-                    
-                    tab1, tab2, tab3, tab4 = st.tabs(["Rendered Report", "Visualizations", "Equations", "Markdown Source"])
-                    
-                    with tab1:
-                        render_report_with_visualizations(report_content)
-                    
                     with tab2:
+                        findings = st.session_state.get("research_findings")
+                        if findings is not None:
+                            st.markdown("### Relationship Graph")
+                            from findings import relationship_graph_inputs
+                            nodes, edges = relationship_graph_inputs(findings)
+                            if len(nodes) > LARGE_GRAPH_NODES:
+                                VisualizationTools.render_interactive_graph(
+                                    VisualizationTools.create_interactive_graph(nodes, edges))
+                            else:
+                                st.image(VisualizationTools.create_relationship_graph(nodes, edges))
+                            st.markdown("---")
                         st.markdown("### Mermaid Diagrams")
-                        mermaid_diagrams = VisualizationTools.extract_mermaid_diagrams(report_content)
+                        mermaid_diagrams = list(dict.fromkeys(VisualizationTools.extract_mermaid_diagrams(report_content)))
                         for i, diagram in enumerate(mermaid_diagrams, 1):
                             st.markdown(f"#### Diagram {i}")
                             diagram_code = diagram.replace("Security Operations Center (SOC)", "SOC")
@@ -427,16 +541,26 @@ def main():
                     with tab4:
                         st.text_area("Markdown Source", report_content, height=500)
                     
+                    with tab5:
+                        if st.session_state.get("research_trace"):
+                            render_performance(st.session_state.research_trace)
+                    
                     st.download_button(
                         label="📥 Download Report",
                         data=report_content,
-                        file_name=f"research_report_{datetime.now().strftime('%Y%m%d')}.md",
+                        file_name=f"research_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md",
                         mime="text/markdown"
                     )
             
             except Exception as e:
                 st.error(f"An error occurred during the research process: {str(e)}")
                 status_placeholder.markdown(f'<p class="status error">Error: {str(e)}</p>', unsafe_allow_html=True)
+                if st.button("🔁 Resume Research", help="Retry from the last completed step"):
+                    job_queue.resume(job_id)
+                    st.rerun()
+    
+    with st.expander("🗂️ Past Reports", expanded=False):
+        render_past_reports()
     
     with st.expander("📚 Tips for effective research topics", expanded=False):
         st.markdown("""
@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from search_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_MEMORY_BYTES = int(os.getenv("ARTIFACT_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+DEFAULT_DISK_BYTES = int(os.getenv("ARTIFACT_CACHE_DISK_BYTES", 512 * 1024 * 1024))
+
+
+def content_key(*parts):
+    """Content address for the inputs that determine a rendered artifact"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ArtifactCache:
+    """Size-bounded LRU of rendered artifacts in memory, spilling evicted entries to disk"""
+
+    def __init__(self, directory=None, memory_bytes=DEFAULT_MEMORY_BYTES, disk_bytes=DEFAULT_DISK_BYTES):
+        self.directory = directory or os.path.join(DEFAULT_CACHE_DIR, "artifacts")
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _spill(self, key, data):
+        path = self._path(key)
+        if not os.path.exists(path):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        entries = [e for e in os.scandir(self.directory) if e.is_file() and not e.name.endswith(".tmp")]
+        total = sum(e.stat().st_size for e in entries)
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            if total <= self.disk_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+
+    def _remember(self, key, data):
+        if key in self._memory:
+            self._memory_size -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            old_key, old_data = self._memory.popitem(last=False)
+            self._memory_size -= len(old_data)
+            self._spill(old_key, old_data)
+
+    def get(self, key):
+        """Return cached bytes for key from memory or disk, or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+            path = self._path(key)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+                self._remember(key, data)
+                self.hits += 1
+                return data
+            self.misses += 1
+            return None
+
+    def put(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+
+    def get_or_create(self, key, factory):
+        """Return cached bytes for key, calling factory() to render them on a miss"""
+        data = self.get(key)
+        if data is None:
+            data = factory()
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+        }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_artifact_cache():
+    """Return the process-wide rendered-artifact cache"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = ArtifactCache()
+        return _shared_cache
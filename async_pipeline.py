@@ -0,0 +1,142 @@
+import asyncio
+
+from citations import format_citations
+from compaction import DEFAULT_MODEL, compact_context
+from streaming import agent_context
+from telemetry import trace_span
+
+SUBTOPICS = [
+    "Latest developments and trends",
+    "Key players and technologies",
+    "Market analysis and future predictions",
+    "Potential challenges and solutions",
+    "Related research papers and citations",
+]
+
+
+def split_topic(topic, subtopics=SUBTOPICS):
+    """Split a research topic into one focused subquery per report section"""
+    return [(title, f"{topic}: {title.lower()}") for title in subtopics]
+
+
+def run_single_task(agent, description, expected_output):
+    """Run one task on a private copy of the agent and return its raw output"""
+    from crewai import Crew, Process, Task
+
+    worker = agent.copy()
+    task = Task(description=description, expected_output=expected_output, agent=worker)
+    crew = Crew(agents=[worker], tasks=[task], process=Process.sequential, verbose=False)
+    with trace_span(agent.role, "task", description=description[:120]), agent_context(agent.role):
+        return str(crew.kickoff())
+
+
+class ParallelResearchPipeline:
+    """Research subtopics concurrently and visualize/write each section as soon as its inputs arrive
+
+    Sections found in prior (heading to markdown) are reused as they are; only the
+    others are researched. The sections of the finished report are left in sections
+    and the headings that were written afresh in refreshed. With a context budget,
+    findings and sections are compacted before they are handed to the next agent.
+    With checkpoints, steps completed by an earlier attempt of the run are skipped.
+    """
+
+    def __init__(self, researcher, visualizer, writer, max_concurrency=3, on_section=None, citations=None,
+                 prior=None, budget=None, model=DEFAULT_MODEL, checkpoints=None):
+        self.researcher = researcher
+        self.visualizer = visualizer
+        self.writer = writer
+        self.max_concurrency = max_concurrency
+        self.on_section = on_section
+        self.prior = prior or {}
+        self.budget = budget
+        self.model = model
+        self.checkpoints = checkpoints
+        self.sections = []
+        self.refreshed = set()
+        self.references = ""
+        if citations:
+            self.references = f"\n\n            Cite from these verified references where relevant:\n{format_citations(citations)}"
+
+    async def _fit(self, tokens, *texts):
+        """Compact texts to share tokens, off the event loop; unchanged without a budget"""
+        if self.budget is None:
+            return texts
+        with trace_span("compaction", "stage", budget=tokens):
+            return await asyncio.to_thread(compact_context, list(texts), tokens, self.model)
+
+    async def _step(self, semaphore, name, agent, description, expected_output):
+        saved = self.checkpoints.get(name) if self.checkpoints else None
+        if saved is not None:
+            return saved
+        async with semaphore:
+            output = await asyncio.to_thread(run_single_task, agent, description, expected_output)
+        if self.checkpoints:
+            self.checkpoints.save(name, output)
+        return output
+
+    async def _section(self, semaphore, index, title, query):
+        if title in self.prior:
+            if self.on_section is not None:
+                self.on_section(index, title, self.prior[title])
+            return self.prior[title]
+        self.refreshed.add(title)
+        findings = await self._step(
+            semaphore, f"{title}: research", self.researcher,
+            f"""Conduct focused research on {query}.
+            Report concrete facts, figures, key players and sources.""",
+            "Detailed research findings in JSON format",
+        )
+        (brief,) = await self._fit(self.budget and self.budget.visualization, findings)
+        visuals = await self._step(
+            semaphore, f"{title}: visualization", self.visualizer,
+            f"""Create visual representations for these research findings on {query}:
+            {brief}
+
+            Provide mermaid diagrams for relationships, timelines or trends where they fit.""",
+            "A collection of visual elements in markdown format",
+        )
+        findings, visuals = await self._fit(self.budget and self.budget.writing, findings, visuals)
+        section = await self._step(
+            semaphore, f"{title}: writing", self.writer,
+            f"""Write the "{title}" section of a research report using these findings and visuals.
+
+            Findings:
+            {findings}
+
+            Visuals:
+            {visuals}
+
+            Start with a level-two markdown heading "## {title}" and keep any mermaid blocks intact.{self.references}""",
+            "A markdown report section with visuals integrated",
+        )
+        if self.on_section is not None:
+            self.on_section(index, title, section)
+        return section
+
+    async def run(self, topic):
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        subtopics = split_topic(topic)
+        sections = await asyncio.gather(*(
+            self._section(semaphore, index, title, query)
+            for index, (title, query) in enumerate(subtopics)
+        ))
+        body = "\n\n".join(sections)
+        headings = ("Executive Summary", "Future Outlook")
+        if not self.refreshed and all(heading in self.prior for heading in headings):
+            summary, outlook = (self.prior[heading] for heading in headings)
+        else:
+            self.refreshed.update(headings)
+            (digest,) = await self._fit(self.budget and self.budget.writing, body)
+            summary, outlook = await asyncio.gather(*(
+                self._step(
+                    semaphore, heading, self.writer,
+                    f"""Write the {heading} for a report on {topic} based on these sections:
+                    {digest}
+
+                    Start with the level-two markdown heading "## {heading}".""",
+                    f"Markdown {heading.lower()} section",
+                )
+                for heading in headings
+            ))
+        self.sections = [("Executive Summary", summary), *zip((title for title, _ in subtopics), sections), ("Future Outlook", outlook)]
+        return f"# Research Report: {topic}\n\n{summary}\n\n{body}\n\n{outlook}\n"
@@ -0,0 +1,211 @@
+"""Run research for many topics from a JSONL, CSV or text file across a worker pool.
+
+Example::
+
+    python batch.py topics.jsonl --workers 4 --timeout 900 --out-dir reports
+"""
+import argparse
+import csv
+import hashlib
+import importlib
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from retry import call_with_retries, cancel_scope, is_rate_limit_error
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+
+def load_topics(path):
+    """Read topics from a .jsonl, .csv or plain text file"""
+    topics = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    topics.append(record["topic"] if isinstance(record, dict) else str(record))
+        elif path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            column = "topic" if "topic" in (reader.fieldnames or []) else reader.fieldnames[0]
+            topics.extend(row[column] for row in reader if row[column].strip())
+        else:
+            topics.extend(line.strip() for line in f if line.strip())
+    return topics
+
+
+def slugify(topic, max_length=80):
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")
+    return slug[:max_length] or "topic"
+
+
+def report_filename(topic):
+    """Readable file name for a topic's report, with a short hash of the topic so that
+    topics with the same slug (case, punctuation, non-Latin text) get separate files"""
+    digest = hashlib.sha1(topic.encode("utf-8")).hexdigest()[:8]
+    return f"{slugify(topic)}-{digest}.md"
+
+
+def default_runner(topic):
+    """Research a topic with research.run_research and return the report text"""
+    from research import run_research
+    return run_research(topic)
+
+
+def resolve_runner(runner):
+    """Accept a callable or a 'module:function' string"""
+    if callable(runner):
+        return runner
+    module_name, _, attr = runner.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def run_with_timeout(fn, timeout):
+    """Run fn() in a daemon thread and raise TimeoutError if it does not finish in time
+
+    Python threads cannot be killed, so a timed-out fn is abandoned rather than
+    stopped: it is cancelled, and its next LLM or search call raises Cancelled
+    instead of reaching the provider, but a call already in flight runs to the end.
+    """
+    if not timeout:
+        return fn()
+    outcome = {}
+    cancel = threading.Event()
+
+    def target():
+        try:
+            with cancel_scope(cancel):
+                outcome["result"] = fn()
+        except BaseException as exc:
+            outcome["error"] = exc
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        cancel.set()
+        raise TimeoutError(f"Topic did not finish within {timeout} seconds")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
+
+
+def process_topic(topic, runner, out_dir, timeout=None, retries=3, base_delay=2.0):
+    """Research one topic and write its report; returns a checkpoint record
+
+    Attempts that hit a rate limit or the timeout are retried with backoff.
+    """
+    fn = resolve_runner(runner)
+    attempts = []
+    start = time.perf_counter()
+    record = {"topic": topic}
+    try:
+        report = call_with_retries(
+            lambda: run_with_timeout(lambda: fn(topic), timeout),
+            retries=retries,
+            base_delay=base_delay,
+            retry_on=lambda exc: isinstance(exc, TimeoutError) or is_rate_limit_error(exc),
+            on_retry=lambda attempt, exc, delay: attempts.append(attempt),
+        )
+        output = os.path.join(out_dir, report_filename(topic))
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(report)
+        record.update(status="ok", output=output)
+    except Exception as exc:
+        record.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+    record.update(attempts=len(attempts) + 1, seconds=round(time.perf_counter() - start, 3))
+    return record
+
+
+def load_checkpoint(out_dir):
+    """Return the latest checkpoint record per topic"""
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    records = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records[record["topic"]] = record
+    return records
+
+
+def summarize(records, skipped, elapsed):
+    durations = [r["seconds"] for r in records if r["status"] == "ok"]
+    failures = [r for r in records if r["status"] != "ok"]
+    return {
+        "total": len(records) + skipped,
+        "succeeded": len(durations),
+        "failed": len(failures),
+        "skipped": skipped,
+        "retries": sum(r["attempts"] - 1 for r in records),
+        "elapsed_seconds": round(elapsed, 3),
+        "topics_per_minute": round(len(records) / elapsed * 60, 3) if elapsed else 0.0,
+        "mean_seconds": round(statistics.mean(durations), 3) if durations else 0.0,
+        "p95_seconds": round(sorted(durations)[int(0.95 * (len(durations) - 1))], 3) if durations else 0.0,
+        "failures": [{"topic": r["topic"], "error": r["error"]} for r in failures],
+    }
+
+
+def run_batch(topics, runner=default_runner, out_dir="reports", workers=4, use_processes=False,
+              timeout=None, retries=3, base_delay=2.0, resume=True, on_result=None):
+    """Research every topic across a worker pool, checkpointing each result as it finishes"""
+    os.makedirs(out_dir, exist_ok=True)
+    done = load_checkpoint(out_dir) if resume else {}
+    pending = [t for t in dict.fromkeys(topics) if done.get(t, {}).get("status") != "ok"]
+    skipped = len(dict.fromkeys(topics)) - len(pending)
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    records = []
+    start = time.perf_counter()
+    with executor_cls(max_workers=workers) as executor, \
+            open(os.path.join(out_dir, CHECKPOINT_FILE), "a", encoding="utf-8") as checkpoint:
+        futures = [
+            executor.submit(process_topic, topic, runner, out_dir, timeout, retries, base_delay)
+            for topic in pending
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            checkpoint.write(json.dumps(record) + "\n")
+            checkpoint.flush()
+            if on_result is not None:
+                on_result(record)
+    return summarize(records, skipped, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("topics_file", help="topics in .jsonl, .csv or one-per-line text")
+    parser.add_argument("--out-dir", default="reports")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="use a process pool instead of threads")
+    parser.add_argument("--timeout", type=float, default=None, help="seconds allowed per topic attempt")
+    parser.add_argument("--retries", type=int, default=3, help="retries on rate-limit errors and timeouts")
+    parser.add_argument("--base-delay", type=float, default=2.0, help="initial backoff in seconds")
+    parser.add_argument("--no-resume", action="store_true", help="ignore the existing checkpoint")
+    parser.add_argument("--runner", default="batch:default_runner",
+                        help="'module:function' that maps a topic to report text")
+    args = parser.parse_args()
+
+    summary = run_batch(
+        load_topics(args.topics_file),
+        runner=args.runner,
+        out_dir=args.out_dir,
+        workers=args.workers,
+        use_processes=args.processes,
+        timeout=args.timeout,
+        retries=args.retries,
+        base_delay=args.base_delay,
+        resume=not args.no_resume,
+        on_result=lambda r: print(f"[{r['status']}] {r['topic']} ({r['seconds']}s, {r['attempts']} attempts)"),
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
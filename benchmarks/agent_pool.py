@@ -0,0 +1,54 @@
+"""Compare per-request agent setup with borrowing agents from the shared pool.
+
+Run with ``python -m benchmarks.agent_pool --requests 50 --threads 8``.
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_pool import AgentPool, ResearchConfig
+from crew_factory import setup_agents
+
+MODEL = "gpt-4o-mini"
+CONFIG = ResearchConfig(MODEL)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def borrow(pool):
+    with pool.agents(CONFIG):
+        pass
+
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(0.95 * (len(samples) - 1))]
+    print(f"{label:<30}{statistics.median(samples):>10.3f} ms median{p95:>10.3f} ms p95")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'first build (cold process)':<30}{timed(lambda: setup_agents(MODEL)):>10.3f} ms")
+    summarize("setup_agents per request", [timed(lambda: setup_agents(MODEL)) for _ in range(args.requests)])
+
+    pool = AgentPool()
+    pool.warm(CONFIG)
+    summarize("pooled, sequential", [timed(lambda: borrow(pool)) for _ in range(args.requests)])
+
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        samples = list(executor.map(lambda _: timed(lambda: borrow(pool)), range(args.requests)))
+    summarize(f"pooled, {args.threads} threads", samples)
+    print(f"pool stats: {pool.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Time and peak memory of the large-graph layout engine at increasing node counts.
+
+Run with ``python -m benchmarks.graph_layout --sizes 1000 10000 100000``.
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from graph_layout import graph_html, layout_graph
+
+
+def planted_graph(n, avg_degree=4, communities=None, seed=0):
+    """Random graph with planted communities, most edges inside a community"""
+    rng = np.random.default_rng(seed)
+    communities = communities or max(2, n // 200)
+    group = rng.integers(0, communities, n)
+    m = n * avg_degree // 2
+    src = rng.integers(0, n, m)
+    members = np.argsort(group, kind="stable")
+    starts = np.searchsorted(group[members], np.arange(communities))
+    counts = np.bincount(group, minlength=communities)
+    inside = rng.random(m) < 0.9
+    g = group[src]
+    dst = np.where(inside, members[starts[g] + (rng.random(m) * counts[g]).astype(int)], rng.integers(0, n, m))
+    nodes = [f"entity-{i}" for i in range(n)]
+    edges = [(nodes[a], nodes[b]) for a, b in zip(src.tolist(), dst.tolist())]
+    return nodes, edges, rng.random(m)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8}{'edges':>9}{'layout s':>10}{'html s':>8}{'peak MB':>9}{'drawn':>8}{'html KB':>9}")
+    for n in args.sizes:
+        nodes, edges, weights = planted_graph(n)
+        tracemalloc.start()
+        start = time.perf_counter()
+        layout = layout_graph(nodes, edges, weights, max_edges=4 * n, iterations=args.iterations)
+        layout_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        page = graph_html(layout)
+        html_seconds = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{n:>8}{len(edges):>9}{layout_seconds:>10.2f}{html_seconds:>8.2f}"
+              f"{peak / 1024 / 1024:>9.1f}{len(layout['names']):>8}{len(page) / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Measure cold import time of the app modules against a startup budget.
+
+Run with ``python -m benchmarks.import_time --budget-ms 1500``. Each module is
+imported in a fresh interpreter with ``-X importtime``; the command exits
+non-zero when a module exceeds the budget or pulls in a deferred dependency.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MODULES = ["app", "crew_factory", "pipeline", "research", "research_agents", "async_pipeline", "batch"]
+DEFERRED = ["crewai", "crewai_tools", "networkx", "matplotlib", "pandas", "streamlit_mermaid"]
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1500))
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr):
+    """Parse -X importtime output into (module, depth, self_us, cumulative_us) rows"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, len(indent) // 2, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module, root):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=root, capture_output=True, text=True)
+    rows = parse_importtime(result.stderr)
+    if result.returncode != 0 or not rows:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+    return rows
+
+
+def subtree(rows, module):
+    """Rows imported on behalf of module, excluding interpreter startup such as site"""
+    end = max(i for i, row in enumerate(rows) if row[0] == module and row[1] == 0)
+    start = max([i + 1 for i, row in enumerate(rows[:end]) if row[1] == 0] or [0])
+    return rows[start:end + 1]
+
+
+def report(module, runs, top):
+    runs = [subtree(rows, module) for rows in runs]
+    totals = [rows[-1][3] / 1000 for rows in runs]
+    rows = runs[-1]
+    loaded = {name.split(".")[0] for name, *_ in rows}
+    print(f"{module:<20}{statistics.median(totals):>10.1f} ms  (min {min(totals):.1f}, {len(rows)} modules)")
+    for name, _, _, cumulative in sorted((r for r in rows if r[1] == 1), key=lambda r: -r[3])[:top]:
+        print(f"    {name:<36}{cumulative / 1000:>10.1f} ms")
+    return statistics.median(totals), sorted(loaded & set(DEFERRED))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5, help="heaviest direct imports to list per module")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    failures = []
+    for module in args.modules:
+        runs = [measure(module, root) for _ in range(args.repeat)]
+        total, deferred = report(module, runs, args.top)
+        if total > args.budget_ms:
+            failures.append(f"{module} took {total:.0f} ms, budget is {args.budget_ms:.0f} ms")
+        if deferred:
+            failures.append(f"{module} eagerly imports {', '.join(deferred)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Measure LLM cache hit rates and latency savings against the offline fake LLM.
+
+Run with ``python -m benchmarks.llm_cache``.
+"""
+import argparse
+import random
+import time
+
+from llm_cache import FakeLLM, SemanticLLMCache
+
+TOPICS = [
+    "quantum computing applications",
+    "renewable energy storage",
+    "AI in healthcare diagnostics",
+    "blockchain in supply chains",
+    "autonomous vehicle safety",
+]
+PHRASINGS = [
+    "Conduct comprehensive research on {topic}",
+    "Conduct comprehensive research on {topic} please",
+    "Conduct a comprehensive research on {topic}",
+]
+
+
+def build_workload(requests, seed=0):
+    rng = random.Random(seed)
+    return [rng.choice(PHRASINGS).format(topic=rng.choice(TOPICS)) for _ in range(requests)]
+
+
+def run(workload, latency, threshold):
+    llm = FakeLLM(latency=latency)
+    cache = SemanticLLMCache(similarity_threshold=threshold) if threshold is not None else None
+    start = time.perf_counter()
+    for prompt in workload:
+        messages = [{"role": "user", "content": prompt}]
+        if cache is None:
+            llm.call(messages)
+        else:
+            cache.complete(messages, lambda: llm.call(messages))
+    elapsed = time.perf_counter() - start
+    return elapsed, llm.calls, cache.stats() if cache else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake LLM call")
+    parser.add_argument("--threshold", type=float, default=0.9, help="cosine similarity for semantic hits")
+    args = parser.parse_args()
+
+    workload = build_workload(args.requests)
+    baseline, baseline_calls, _ = run(workload, args.latency, None)
+    print(f"{'mode':<12}{'seconds':>10}{'llm calls':>12}{'hit rate':>10}")
+    print(f"{'uncached':<12}{baseline:>10.3f}{baseline_calls:>12}{'-':>10}")
+    for label, threshold in (("exact", 0), ("semantic", args.threshold)):
+        elapsed, calls, stats = run(workload, args.latency, threshold)
+        print(f"{label:<12}{elapsed:>10.3f}{calls:>12}{stats['hit_rate']:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Multi-user load test of the job queue behind its admission controller.
+
+Simulated users submit research runs at the same time, some interactive and some
+batch, and the queue admits them under per-user rate limits and a cap on active
+runs. Runs go through JobQueue exactly as app.py submits them; only the runner is
+swapped for a stand-in, so no network or API keys are needed:
+
+    python -m benchmarks.load_test --users 20 --runs-per-user 3 --max-active 4
+
+``--backend sleep`` (the default) holds each slot for ``--run-seconds``; ``--backend
+replay`` runs the real report pipeline against replayed LLM and search responses.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+from admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected  # noqa: E402
+from jobs import DONE, JobQueue  # noqa: E402
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+
+def sleep_runner(run_seconds):
+    def runner(topic, progress, run_id=None, **params):
+        progress.markdown("Researching...")
+        time.sleep(run_seconds * random.uniform(0.5, 1.5))
+        return f"# {topic}\n\nDone."
+
+    return runner
+
+
+def replay_runner(args):
+    from benchmarks.pipeline import run_report
+    from replay import Cassette, ReplayLLM, ReplaySearch
+
+    cassette = Cassette(args.cassette)
+    llm_backend = ReplayLLM(cassette, args.llm_latency)
+    search_backend = ReplaySearch(cassette, args.search_latency)
+    report_args = argparse.Namespace(parallel=False, max_concurrency=1)
+    run_report("warm up", report_args, llm_backend, search_backend)  # warm imports and class builds
+
+    def runner(topic, progress, run_id=None, **params):
+        progress.markdown("Researching...")
+        run_report(topic, report_args, llm_backend, search_backend)
+        return f"# {topic}\n\nDone."
+
+    return runner
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+
+
+def simulate_user(queue, user, priority, args, submitted, rejected, lock):
+    for i in range(args.runs_per_user):
+        time.sleep(random.expovariate(1 / args.think_time) if args.think_time else 0)
+        try:
+            job_id = queue.submit(f"{user} topic {i}", user=user, priority=priority, model="load-test")
+        except AdmissionRejected:
+            with lock:
+                rejected[priority] = rejected.get(priority, 0) + 1
+            continue
+        with lock:
+            submitted.append(job_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--runs-per-user", type=int, default=3)
+    parser.add_argument("--batch-share", type=float, default=0.3, help="fraction of users submitting batch runs")
+    parser.add_argument("--think-time", type=float, default=0.2, help="mean seconds between a user's submissions")
+    parser.add_argument("--max-active", type=int, default=4)
+    parser.add_argument("--max-queued", type=int, default=50)
+    parser.add_argument("--user-burst", type=float, default=2, help="runs a user may submit back to back")
+    parser.add_argument("--user-runs-per-hour", type=float, default=12)
+    parser.add_argument("--backend", choices=("sleep", "replay"), default="sleep")
+    parser.add_argument("--run-seconds", type=float, default=0.5, help="mean length of a run with --backend sleep")
+    parser.add_argument("--cassette", help="replay responses recorded in this file (--backend replay)")
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    # CrewAI logs every task to stdout; keep the load test output readable
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    runner = sleep_runner(args.run_seconds) if args.backend == "sleep" else replay_runner(args)
+    admission = AdmissionController(max_active=args.max_active, max_queued=args.max_queued,
+                                    user_rate=args.user_runs_per_hour / 3600, user_burst=args.user_burst)
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(runner, path=os.path.join(tmp, "jobs.sqlite3"), admission=admission, recover=False)
+        submitted, rejected, lock = [], {}, threading.Lock()
+        users = [(f"user-{i}", BATCH if i < args.users * args.batch_share else INTERACTIVE)
+                 for i in range(args.users)]
+        start = time.perf_counter()
+        threads = [threading.Thread(target=simulate_user, args=(queue, user, priority, args, submitted, rejected, lock))
+                   for user, priority in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        jobs = [queue.wait(job_id, poll_interval=0.05) for job_id in submitted]
+        elapsed = time.perf_counter() - start
+    sys.stdout = stdout
+
+    admission_stats = admission.stats()
+    summary = {
+        "users": args.users,
+        "max_active": args.max_active,
+        "peak_active": admission_stats["peak_active"],
+        "submitted": len(submitted),
+        "rejected": sum(rejected.values()),
+        "completed": sum(job["status"] == DONE for job in jobs),
+        "runs_per_minute": len(jobs) / elapsed * 60,
+    }
+    for priority, name in sorted(PRIORITY_NAMES.items()):
+        finished = [job for job in jobs if job["priority"] == priority and job["status"] == DONE]
+        summary[f"{name}_rejected"] = rejected.get(priority, 0)
+        if finished:
+            waits = [job["started_at"] - job["created_at"] for job in finished]
+            latencies = [job["finished_at"] - job["created_at"] for job in finished]
+            summary[f"{name}_wait_p50_seconds"] = statistics.median(waits)
+            summary[f"{name}_wait_p90_seconds"] = percentile(waits, 0.9)
+            summary[f"{name}_latency_p50_seconds"] = statistics.median(latencies)
+            summary[f"{name}_latency_p90_seconds"] = percentile(latencies, 0.9)
+    for key, value in summary.items():
+        print(f"{key:<30}{value:>12.2f}" if isinstance(value, float) else f"{key:<30}{value:>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    if admission_stats["peak_active"] > args.max_active:
+        print(f"peak_active {admission_stats['peak_active']} exceeded max_active {args.max_active}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""Page fetch, extraction and deduplication against a local HTTP fixture server.
+
+Serves generated article pages from 127.0.0.1, wrapped in navigation, footer and
+script boilerplate, with syndicated near-copies, slow pages, errors and a binary
+file mixed in. Then fetches them through PageFetcher, so no network is needed:
+
+    python -m benchmarks.page_fetch --pages 40 --latency 0.2 --concurrency 8
+
+Reports cold and cached fetch time against fetching one page at a time, how much
+of each page survives extraction, and how many copies were dropped. Exits non-zero
+if boilerplate leaks into the extracted text or a copy is not caught.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from page_fetch import PageFetcher, normalize_url
+from search_cache import SearchCache
+
+WORDS = """adoption analysis architecture battery benchmark capacity carbon chip cloud compute cost data
+deployment design device efficiency energy factory forecast framework grid growth hardware industry
+infrastructure investment latency market model network performance platform policy power production
+quantum regulation research revenue risk scale sensor silicon software storage supply system
+technology throughput training vendor workload""".split()
+BOILERPLATE = "Subscribe to our newsletter"
+
+
+def article(seed, paragraphs=8):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(30, 60))).capitalize() + "."
+            for _ in range(paragraphs)]
+
+
+def page_html(title, paragraphs, site):
+    body = "".join(f"<p>{text}</p>" for text in paragraphs)
+    return f"""<!doctype html><html><head><title>{title}</title>
+<script>var tracking = "{BOILERPLATE}";</script><style>p {{ margin: 0 }}</style></head>
+<body><header><nav><a href="/">Home</a> <a href="/news">News</a> {BOILERPLATE} at {site}</nav></header>
+<div class="layout"><aside><ul><li>{BOILERPLATE} for weekly updates from {site}</li></ul></aside>
+<div class="content"><h1>{title}</h1><p>By Staff</p>{body}<p>Share</p></div></div>
+<footer><p>Copyright {site}. {BOILERPLATE} and never miss a story.</p></footer></body></html>"""
+
+
+class Fixtures:
+    """Pages served by the fixture server, and which of them are copies of another"""
+
+    def __init__(self, pages, latency):
+        self.latency = latency
+        self.routes = {}
+        self.copies = set()
+        for i in range(pages):
+            paragraphs = article(i)
+            self.routes[f"/article/{i}"] = page_html(f"Article {i}", paragraphs, "example.org")
+            if i % 4 == 0:
+                # Syndicated elsewhere with its own chrome and one sentence reworded
+                edited = paragraphs[:-1] + [paragraphs[-1].replace(".", " today.")]
+                self.routes[f"/syndicated/{i}"] = page_html(f"Article {i} | Wire", edited, "wire.example.net")
+                self.copies.add(f"/syndicated/{i}")
+        self.errors = ["/missing", "/report.pdf"]
+
+
+def serve(fixtures):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(fixtures.latency)
+            if self.path == "/report.pdf":
+                body, content_type, status = b"%PDF-1.4 binary", "application/pdf", 200
+            elif self.path in fixtures.routes:
+                body, content_type, status = fixtures.routes[self.path].encode(), "text/html; charset=utf-8", 200
+            else:
+                body, content_type, status = b"not found", "text/plain", 404
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed_fetch(fetcher, urls):
+    start = time.perf_counter()
+    documents = fetcher.fetch(urls)
+    return time.perf_counter() - start, documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40, help="distinct articles served")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds the server waits before each response")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    fixtures = Fixtures(args.pages, args.latency)
+    server = serve(fixtures)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    paths = list(fixtures.routes) + fixtures.errors
+    urls = [f"{base}{path}?utm_source=benchmark#top" for path in paths]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def fetcher(concurrency):
+            cache = SearchCache(path=os.path.join(tmp, f"pages-{concurrency}.sqlite3"), ttl=0, table="pages")
+            return PageFetcher(cache=cache, concurrency=concurrency)
+
+        sequential_seconds, _ = timed_fetch(fetcher(1), urls)
+        pooled = fetcher(args.concurrency)
+        cold_seconds, documents = timed_fetch(pooled, urls)
+        warm_seconds, cached = timed_fetch(pooled, urls)
+    server.shutdown()
+
+    html_chars = sum(len(fixtures.routes[path]) for path in fixtures.routes)
+    kept = {normalize_url(document.url).replace(base, "") for document in documents}
+    leaked = [document.url for document in documents if BOILERPLATE in document.text]
+    missed = sorted(fixtures.copies & kept)
+    summary = {
+        "urls": len(urls),
+        "concurrency": args.concurrency,
+        "sequential_seconds": sequential_seconds,
+        "cold_seconds": cold_seconds,
+        "cached_seconds": warm_seconds,
+        "speedup": sequential_seconds / cold_seconds,
+        "documents": len(documents),
+        "copies_dropped": len(fixtures.copies - kept),
+        "failed": len(fixtures.routes) + len(fixtures.errors) - len(documents) - len(fixtures.copies - kept),
+        "extracted_share": sum(len(document.text) for document in documents) / html_chars,
+        "boilerplate_leaks": len(leaked),
+        "missed_copies": len(missed),
+        "cached_matches_cold": [d.url for d in cached] == [d.url for d in documents],
+    }
+    for key, value in summary.items():
+        print(f"{key:<24}{value:>12.2f}" if isinstance(value, float) else f"{key:<24}{value!s:>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 1 if leaked or missed or not summary["cached_matches_cold"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
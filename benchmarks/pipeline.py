@@ -0,0 +1,141 @@
+"""End-to-end report latency, throughput and peak memory against replayed backends.
+
+Runs the real setup_agents / create_research_tasks / Crew pipeline with LLM and
+Serper responses replayed from a cassette, so results are deterministic and no
+network is needed:
+
+    python -m benchmarks.pipeline --reports 20 --concurrency 4 --llm-latency 0.2
+
+Pass ``--record cassette.json`` with real API keys to capture responses, then
+``--cassette cassette.json`` to replay them. Without a cassette, scripted
+responses stand in for the model and search engine.
+"""
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+from crew_factory import setup_agents  # noqa: E402
+from llm_cache import cached_llm  # noqa: E402
+from pipeline import run_report_pipeline  # noqa: E402
+from replay import Cassette, ReplayLLM, ReplaySearch  # noqa: E402
+from report_parser import parse_report  # noqa: E402
+from search_cache import cached_search_tool  # noqa: E402
+from telemetry import start_trace, summarize_trace  # noqa: E402
+
+MODEL = "gpt-4o-mini"
+
+
+class Passthrough:
+    """Stands in for the LLM and search caches so every call reaches the replayed backend"""
+
+    def complete(self, messages, call, namespace=""):
+        return call()
+
+    def fetch(self, query, backend, **params):
+        return backend(query, **params)
+
+
+class Quiet:
+    def markdown(self, *args, **kwargs):
+        pass
+
+
+def recorders(model):
+    """Backends that call the real APIs, used while recording a cassette"""
+    import litellm
+    from crewai_tools import SerperDevTool
+
+    def llm(messages):
+        return litellm.completion(model=model, messages=messages).choices[0].message.content
+
+    def search(query, **params):
+        return SerperDevTool(n_results=params.get("n_results") or 10)._run(search_query=query)
+
+    return llm, search
+
+
+def run_report(topic, args, llm_backend, search_backend):
+    start = time.perf_counter()
+    llm = cached_llm(MODEL, cache=Passthrough(), fake=llm_backend)
+    tool = cached_search_tool(cache=Passthrough(), backend=search_backend)
+    agents = setup_agents(MODEL, llm=llm, search_tool=tool)
+    for agent in agents:
+        agent.verbose = False
+    with start_trace("benchmark_report", export=False, topic=topic) as tracer:
+        report = run_report_pipeline(topic, Quiet(), agents, parallel=args.parallel,
+                                     max_concurrency=args.max_concurrency, verbose=False)
+    parsed = parse_report(report)
+    parsed.blocks, parsed.mermaid_diagrams, parsed.latex_equations
+    return time.perf_counter() - start, summarize_trace(tracer.to_dicts())
+
+
+def percentile(samples, q):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(round(q * (len(samples) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reports", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=2, help="reports generated at the same time")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="seconds added to each LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.05, help="seconds added to each search")
+    parser.add_argument("--parallel", action="store_true", help="use the parallel subtopic pipeline")
+    parser.add_argument("--max-concurrency", type=int, default=3)
+    parser.add_argument("--cassette", help="replay responses recorded in this file")
+    parser.add_argument("--record", help="call the real APIs and record responses to this file")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    cassette = Cassette(args.record or args.cassette)
+    llm_record, search_record = recorders(MODEL) if args.record else (None, None)
+    llm_backend = ReplayLLM(cassette, 0.0 if args.record else args.llm_latency, record=llm_record)
+    search_backend = ReplaySearch(cassette, 0.0 if args.record else args.search_latency, record=search_record)
+
+    # CrewAI logs every task to stdout; keep the benchmark output readable
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    topics = [f"benchmark topic {i}" for i in range(args.reports)]
+    run_report(topics[0], args, llm_backend, search_backend)  # warm imports and class builds
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda t: run_report(t, args, llm_backend, search_backend), topics))
+    elapsed = time.perf_counter() - start
+    sys.stdout = stdout
+    if args.record:
+        cassette.save()
+
+    latencies = [latency for latency, _ in results]
+    summary = {
+        "reports": args.reports,
+        "concurrency": args.concurrency,
+        "p50_seconds": statistics.median(latencies),
+        "p90_seconds": percentile(latencies, 0.9),
+        "p99_seconds": percentile(latencies, 0.99),
+        "reports_per_minute": args.reports / elapsed * 60,
+        "llm_calls_per_report": statistics.mean(trace["llm_calls"] for _, trace in results),
+        "tool_calls_per_report": statistics.mean(trace["tool_calls"] for _, trace in results),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+        "cassette_hits": cassette.hits,
+        "cassette_misses": cassette.misses,
+    }
+    for key, value in summary.items():
+        print(f"{key:<24}{value:>12.2f}" if isinstance(value, float) else f"{key:<24}{value:>12}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
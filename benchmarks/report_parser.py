@@ -0,0 +1,64 @@
+"""Compare the single-pass report parser with the previous per-tab regex scans.
+
+Run with ``python -m benchmarks.report_parser --megabytes 4``.
+"""
+import argparse
+import re
+import time
+
+from report_parser import parse_report, tokenize
+
+CHUNK = """## Market Analysis
+
+The market grew by $x^2 + 3x$ percent while adoption followed $$N(t) = N_0 e^{rt}$$ closely.
+Key players continue to invest in research and development across several regions.
+
+```mermaid
+graph TD
+    A[Research] --> B[Development]
+    B --> C[Market]
+```
+
+"""
+
+
+def legacy_scan(report):
+    """The regex passes the three report tabs used to run on every rerun"""
+    mermaid = list(re.finditer(r"```mermaid.*?```", report, re.DOTALL))
+    latex = list(re.finditer(r"\$\$.*?\$\$", report, re.DOTALL))
+    matches = sorted(mermaid + latex, key=lambda m: m.start())
+    for match in matches:
+        re.sub(r"\$([^\$]+)\$", r"\\(\1\\)", match.group())
+    re.findall(r"```mermaid\n(.*?)```", report, re.DOTALL)
+    re.findall(r"\$([^\$]+)\$", report)
+    re.findall(r"\$\$(.*?)\$\$", report, re.DOTALL)
+
+
+def all_tabs(report):
+    parsed = parse_report(report)
+    return parsed.blocks, parsed.mermaid_diagrams, parsed.latex_equations
+
+
+def timed(fn, report, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(report)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = CHUNK * int(args.megabytes * 1024 * 1024 / len(CHUNK))
+    print(f"report size: {len(report) / 1024 / 1024:.1f} MB, {len(tokenize(report)[0])} sections")
+    print(f"{'legacy regex scans':<28}{timed(legacy_scan, report, args.repeat) * 1000:>10.1f} ms")
+    print(f"{'single pass, cold':<28}{timed(lambda r: tokenize(r), report, args.repeat) * 1000:>10.1f} ms")
+    all_tabs(report)
+    print(f"{'all tabs, cached rerun':<28}{timed(all_tabs, report, args.repeat) * 1000:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
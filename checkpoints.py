@@ -0,0 +1,51 @@
+import os
+import threading
+import uuid
+
+from search_cache import DEFAULT_CACHE_DIR, SearchCache
+
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", 24 * 3600))
+
+
+def new_run_id():
+    return uuid.uuid4().hex[:12]
+
+
+class Checkpoints:
+    """Outputs of one run's completed tasks, saved as each finishes so a retry can skip them
+
+    scope (the topic and settings of the run) is part of every key, so a run id reused
+    for a different topic or settings starts afresh instead of resuming another run.
+    """
+
+    def __init__(self, run_id=None, cache=None, scope=None):
+        self.run_id = run_id or new_run_id()
+        self.cache = cache or get_checkpoint_cache()
+        self.scope = scope or {}
+        self.resumed = []
+        self._lock = threading.Lock()
+
+    def get(self, task):
+        """Return the saved output of task in this run, or None"""
+        output = self.cache.get(self.run_id, task=task, scope=self.scope)
+        if output is not None:
+            with self._lock:
+                self.resumed.append(task)
+        return output
+
+    def save(self, task, output):
+        self.cache.set(self.run_id, output, task=task, scope=self.scope)
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_checkpoint_cache():
+    """Return the process-wide checkpoint store"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SearchCache(path=os.path.join(DEFAULT_CACHE_DIR, "checkpoints.sqlite3"),
+                                        ttl=CHECKPOINT_TTL, table="task_checkpoints")
+        return _shared_cache
@@ -0,0 +1,108 @@
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from rate_limit import TokenBucket
+from search_cache import DEFAULT_CACHE_DIR, SearchCache
+from telemetry import current_span, trace_span
+
+CITATION_TTL = float(os.getenv("CITATION_CACHE_TTL", 30 * 24 * 3600))
+SCHOLAR_RATE = float(os.getenv("SCHOLAR_REQUESTS_PER_SECOND", 0.5))
+
+
+def scholarly_backend(query, limit):
+    """Fetch publications from Google Scholar through the scholarly package"""
+    from scholarly import scholarly
+
+    citations = []
+    for pub in islice(scholarly.search_pubs(query), limit):
+        bib = pub.get("bib", {}) if isinstance(pub, dict) else getattr(pub, "bib", {})
+        url = pub.get("pub_url", "") if isinstance(pub, dict) else getattr(pub, "pub_url", "")
+        citations.append({
+            'title': bib.get('title', ''),
+            'author': bib.get('author', ''),
+            'year': bib.get('pub_year', bib.get('year', '')),
+            'doi': bib.get('doi', ''),
+            'url': url,
+        })
+    return citations
+
+
+def citation_key(citation):
+    """Identity used for deduplication: the DOI when known, else the normalized title"""
+    doi = str(citation.get('doi') or '').strip().lower()
+    if doi:
+        return f"doi:{doi}"
+    return "title:" + re.sub(r"[^a-z0-9]+", " ", str(citation.get('title', '')).lower()).strip()
+
+
+def dedupe_citations(citations):
+    unique = {}
+    for citation in citations:
+        unique.setdefault(citation_key(citation), citation)
+    return list(unique.values())
+
+
+def citation_queries(topic):
+    """Queries fanned out for a topic: the topic itself plus survey-style variants"""
+    return [topic, f"{topic} review", f"{topic} recent advances"]
+
+
+def format_citations(citations):
+    """Format citations as a numbered markdown reference list"""
+    lines = []
+    for i, c in enumerate(citations, 1):
+        author = ", ".join(c['author']) if isinstance(c.get('author'), list) else c.get('author', '')
+        year = f" ({c['year']})" if c.get('year') else ""
+        link = f" {c['url']}" if c.get('url') else ""
+        lines.append(f"{i}. {author}{year}. *{c.get('title', '')}*.{link}".strip())
+    return "\n".join(lines)
+
+
+class CitationService:
+    """Concurrent, cached and rate-limited citation lookups"""
+
+    def __init__(self, backend=scholarly_backend, cache=None, rate_limiter=None, max_workers=4):
+        self.backend = backend
+        self.cache = cache or SearchCache(
+            path=os.path.join(DEFAULT_CACHE_DIR, "citations.sqlite3"), ttl=CITATION_TTL, table="citations")
+        self.rate_limiter = rate_limiter or TokenBucket(SCHOLAR_RATE, capacity=1)
+        self.max_workers = max_workers
+
+    def _lookup(self, query, limit):
+        start = time.perf_counter()
+        self.rate_limiter.acquire()
+        span = current_span()
+        if span is not None:
+            span.set(cache_hit=False, rate_limit_wait_ms=(time.perf_counter() - start) * 1000)
+        return self.backend(query, limit)
+
+    def fetch(self, query, limit=5):
+        """Return up to limit deduplicated citations for one query"""
+        with trace_span("scholarly", "tool", query=query, cache_hit=True):
+            return dedupe_citations(self.cache.fetch(query, self._lookup, limit=limit) or [])
+
+    def fetch_many(self, queries, limit=5):
+        """Fetch several queries concurrently and merge them into one deduplicated list"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Each lookup runs in a copy of the caller's context so it is traced under the caller's span
+            futures = [executor.submit(contextvars.copy_context().run, self.fetch, q, limit) for q in queries]
+            results = [future.result() for future in futures]
+        return dedupe_citations([c for result in results for c in result])
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def get_citation_service():
+    """Return the process-wide citation service"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = CitationService()
+        return _shared_service
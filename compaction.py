@@ -0,0 +1,212 @@
+import json
+import math
+import re
+from collections import Counter, namedtuple
+
+from report_parser import BLOCK_LATEX, MERMAID, tokenize
+from telemetry import record
+
+ContextBudget = namedtuple("ContextBudget", ["visualization", "writing"])
+
+# Research depth (the sidebar slider) to the context tokens each downstream task may receive
+DEPTH_BUDGETS = {
+    1: ContextBudget(visualization=1000, writing=2000),
+    2: ContextBudget(visualization=1500, writing=3500),
+    3: ContextBudget(visualization=2500, writing=6000),
+    4: ContextBudget(visualization=4000, writing=9000),
+    5: ContextBudget(visualization=6000, writing=14000),
+}
+DEFAULT_MODEL = "gpt-4o-mini"
+DUPLICATE_SIMILARITY = 0.8
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(\[*])")
+_STOPWORDS = frozenset("""a an and are as at be by for from has have in is it its of on or that the this to was
+were will with which their they these those than then also into over more most such can may""".split())
+
+
+def context_budget(depth):
+    """Token budgets for the given research depth, clamped to the slider range"""
+    return DEPTH_BUDGETS[min(max(int(depth), min(DEPTH_BUDGETS)), max(DEPTH_BUDGETS))]
+
+
+def count_tokens(text, model=DEFAULT_MODEL):
+    """Count tokens with the model's tokenizer, locally; a rough estimate if none is available"""
+    try:
+        import litellm
+
+        return litellm.token_counter(model=model, text=text)
+    except Exception:
+        return len(text) // 4 + 1
+
+
+def _words(text):
+    return _WORD.findall(text.lower())
+
+
+def _shingles(text):
+    words = _words(text)
+    if len(words) < 3:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+
+
+def dedupe_snippets(items, key=str, threshold=DUPLICATE_SIMILARITY):
+    """Drop items whose text repeats an earlier one, exactly or as a near copy
+
+    Near copies are detected by the Jaccard similarity of word trigrams, which catches
+    the same snippet syndicated across sites with small edits.
+    """
+    items = [(item, _shingles(key(item))) for item in items]
+    frequency = Counter(shingle for _, shingles in items for shingle in shingles)
+    kept, seen, index = [], [], {}
+    for item, shingles in items:
+        if not shingles:
+            kept.append(item)
+            continue
+        # Prefix filtering: sets this similar share one of their rarest few shingles,
+        # so only items indexed under those need a full comparison
+        rarest = sorted(shingles, key=lambda shingle: (frequency[shingle], shingle))
+        prefix = rarest[:len(shingles) - math.ceil(threshold * len(shingles)) + 1]
+        candidates = {i for shingle in prefix for i in index.get(shingle, ())}
+        if any(len(shingles & seen[i]) / len(shingles | seen[i]) >= threshold for i in candidates):
+            continue
+        kept.append(item)
+        for shingle in prefix:
+            index.setdefault(shingle, []).append(len(seen))
+        seen.append(shingles)
+    return kept
+
+
+def dedupe_search_results(results):
+    """Remove repeated links and near-duplicate snippets from a Serper response"""
+    if not isinstance(results, dict) or not isinstance(results.get("organic"), list):
+        return results
+    links = set()
+    organic = []
+    for item in results["organic"]:
+        link = item.get("link") if isinstance(item, dict) else None
+        if link and link in links:
+            continue
+        links.add(link)
+        organic.append(item)
+    organic = dedupe_snippets(organic, key=lambda item: item.get("snippet", "") if isinstance(item, dict) else str(item))
+    return {**results, "organic": organic}
+
+
+def _units(text):
+    """Split text into (line, kind, content) units: diagrams and equations whole, prose by sentence"""
+    units = []
+    line = 0
+    for section in tokenize(text)[0]:
+        if section.kind in (MERMAID, BLOCK_LATEX):
+            line += 1
+            units.append((line, section.kind, section.content))
+            line += 1
+            continue
+        for i, row in enumerate(section.content.split("\n")):
+            line += i > 0
+            kind = "heading" if row.lstrip().startswith("#") else "text"
+            for sentence in _SENTENCE.split(row) if kind == "text" else [row]:
+                if sentence.strip():
+                    units.append((line, kind, sentence.strip()))
+    return units
+
+
+def _join(units):
+    lines = {}
+    for line, _, content in units:
+        lines.setdefault(line, []).append(content)
+    return "\n".join(" ".join(parts) for _, parts in sorted(lines.items()))
+
+
+def summarize(text, budget, model=DEFAULT_MODEL):
+    """Extractive summary of text within budget tokens
+
+    Repeated sentences are dropped first. Sentences are then ranked by the frequency
+    of their content words across the whole text, with headings, diagrams and
+    equations kept ahead of prose, and the best ones are kept in their original order.
+    """
+    units = dedupe_snippets(_units(text), key=lambda unit: unit[2])
+    frequency = Counter(w for _, kind, content in units if kind == "text"
+                        for w in _words(content) if w not in _STOPWORDS)
+
+    def score(unit):
+        _, kind, content = unit
+        if kind != "text":
+            return float("inf")
+        words = [w for w in _words(content) if w not in _STOPWORDS]
+        return sum(frequency[w] for w in set(words)) / (len(words) ** 0.5 or 1)
+
+    ranked = sorted(range(len(units)), key=lambda i: (-score(units[i]), i))
+    chosen, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(units[i][2], model) + 1
+        if used + cost <= budget:
+            chosen.add(i)
+            used += cost
+    return _join(units[i] for i in sorted(chosen))
+
+
+def compact_findings(findings, budget, model=DEFAULT_MODEL):
+    """Serialize structured findings within budget, trimming the longest lists from the end"""
+    data = findings.model_dump(exclude_defaults=True)
+    for name, value in data.items():
+        if isinstance(value, list):
+            data[name] = dedupe_snippets(value, key=lambda item: json.dumps(item, sort_keys=True), threshold=1.0)
+
+    def dump():
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    text = dump()
+    tokens = count_tokens(text, model)
+    while tokens > budget:
+        lists = [name for name, value in data.items() if isinstance(value, list) and value]
+        if not lists:
+            data["summary"] = summarize(data.get("summary", ""), budget // 2, model)
+            return dump()
+        # Drop about as many items as the overshoot is worth, then measure again
+        items = sum(len(data[name]) for name in lists)
+        for _ in range(max(1, items * (tokens - budget) // tokens)):
+            longest = max(lists, key=lambda name: len(data[name]))
+            if data[longest]:
+                data[longest].pop()
+        text = dump()
+        tokens = count_tokens(text, model)
+    return text
+
+
+def compact(text, budget, model=DEFAULT_MODEL):
+    """Fit one task output into budget tokens, returning it unchanged if it already fits"""
+    if count_tokens(text, model) <= budget:
+        return text
+    from findings import parse_findings
+
+    findings = parse_findings(text)
+    if findings is not None:
+        return compact_findings(findings, budget, model)
+    return summarize(text, budget, model)
+
+
+def compact_context(texts, budget, model=DEFAULT_MODEL):
+    """Share budget between several task outputs and compact each to its share
+
+    Outputs smaller than an even share keep their full text, and what they leave
+    unused is split among the larger ones. Token counts before and after are added
+    to the active trace span.
+    """
+    sizes = [count_tokens(text, model) for text in texts]
+    shares = [0] * len(texts)
+    remaining = budget
+    pending = sorted(range(len(texts)), key=lambda i: sizes[i])
+    while pending:
+        share = remaining // len(pending)
+        i = pending.pop(0)
+        shares[i] = min(sizes[i], share)
+        remaining -= shares[i]
+    compacted = [text if size <= share else compact(text, share, model)
+                 for text, size, share in zip(texts, sizes, shares)]
+    record("tokens_before", sum(sizes))
+    record("tokens_after", sum(size if size <= share else count_tokens(text, model)
+                               for text, size, share in zip(compacted, sizes, shares)))
+    return compacted
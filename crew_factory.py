@@ -0,0 +1,117 @@
+"""Agent and task factory for the three-agent research crew.
+
+Importing this module is cheap and has no side effects: crewai, the search
+tool and the LLM client are only loaded when agents or tasks are built.
+"""
+import os
+from datetime import datetime
+
+from citations import format_citations
+
+WRITER_ROLE = 'Technical Writer'
+
+
+def setup_agents(openai_model=None, llm=None, search_tool=None):
+    """Setup and return the agents required for the research"""
+    from crewai import Agent
+    from llm_cache import cached_llm
+    from search_cache import cached_search_tool
+
+    search_tool = search_tool or cached_search_tool()
+    llm = llm or cached_llm(openai_model or os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+
+    researcher = Agent(
+        role='Senior Research Analyst',
+        goal='Conduct comprehensive research and create detailed analysis with visualizations',
+        verbose=True,
+        memory=True,
+        backstory="""You are an elite research analyst with expertise in creating 
+        comprehensive reports with data visualization. You excel at identifying patterns,
+        creating relationships between concepts, and presenting information in an 
+        engaging and visually appealing manner.""",
+        tools=[search_tool],
+        llm=llm,
+        allow_delegation=True
+    )
+
+    visualizer = Agent(
+        role='Data Visualization Specialist',
+        goal='Create compelling visualizations and diagrams from research data',
+        verbose=True,
+        memory=True,
+        backstory="""You specialize in transforming complex data into clear, 
+        visually appealing diagrams and charts. You have expertise in creating 
+        mermaid diagrams, relationship graphs, and other visual representations.""",
+        tools=[search_tool],
+        llm=llm,
+        allow_delegation=False
+    )
+
+    writer = Agent(
+        role=WRITER_ROLE,
+        goal='Create comprehensive and well-structured technical documentation',
+        verbose=True,
+        memory=True,
+        backstory="""You are an experienced technical writer who excels at 
+        creating clear, engaging, and well-organized documentation. You know 
+        how to present complex information in an accessible format.""",
+        tools=[search_tool],
+        llm=llm,
+        allow_delegation=False
+    )
+    
+    return researcher, visualizer, writer
+
+
+def create_research_tasks(topic, researcher, visualizer, writer, citations=None):
+    """Create and return the tasks for the research crew"""
+    from crewai import Task
+    from findings import FINDINGS_FORMAT
+
+    research_task = Task(
+        description=f"""Conduct comprehensive research on {topic}. Include:
+        1. Latest developments and trends
+        2. Key players and technologies
+        3. Market analysis and future predictions
+        4. Potential challenges and solutions
+        5. Related research papers and citations
+        
+        Return the findings as a single JSON object so they can be visualized directly.""",
+        agent=researcher,
+        expected_output=f"Detailed research findings as one JSON object of this shape: {FINDINGS_FORMAT}"
+    )
+
+    visualization_task = Task(
+        description=f"""Create visual representations for the research on {topic}:
+        1. Generate a mermaid diagram showing the relationship between key concepts
+        2. Create a relationship graph of key players and technologies
+        3. Design a timeline of developments
+        4. Visualize market trends and predictions""",
+        agent=visualizer,
+        expected_output="A collection of visual elements in markdown format",
+        context=[research_task]
+    )
+
+    references = ""
+    if citations:
+        references = f"""
+        
+        Cite from these verified references in the Citations and References section:
+{format_citations(citations)}"""
+
+    writing_task = Task(
+        description=f"""Create a comprehensive report on {topic} including:
+        1. Executive Summary
+        2. Detailed Analysis
+        3. Visual Elements
+        4. Citations and References
+        5. Future Outlook
+        
+        Format the report in markdown with clear sections and styling.{references}""",
+        agent=writer,
+        expected_output="A complete markdown report with all elements integrated",
+        context=[research_task, visualization_task],
+        output_file=f"research_report_{datetime.now().strftime('%Y%m%d')}.md"
+    )
+
+    return [research_task, visualization_task, writing_task]
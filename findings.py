@@ -0,0 +1,126 @@
+import json
+import re
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+class Entity(BaseModel):
+    name: str
+    category: str = ""
+    description: str = ""
+
+
+class Relationship(BaseModel):
+    source: str
+    target: str
+    label: str = ""
+
+
+class TimelineEvent(BaseModel):
+    date: str
+    event: str
+
+
+class Trend(BaseModel):
+    name: str
+    value: Optional[float] = None
+    unit: str = ""
+    period: str = ""
+    description: str = ""
+
+
+class Finding(BaseModel):
+    title: str
+    summary: str = ""
+
+
+class ResearchFindings(BaseModel):
+    """Structured output of the research task, handed to visualization and writing as-is"""
+
+    topic: str
+    summary: str = ""
+    developments: List[Finding] = Field(default_factory=list, description="Latest developments and trends")
+    key_players: List[Entity] = Field(default_factory=list, description="Companies, institutions and people")
+    technologies: List[Entity] = Field(default_factory=list, description="Key technologies")
+    relationships: List[Relationship] = Field(default_factory=list, description="How players and technologies relate")
+    timeline: List[TimelineEvent] = Field(default_factory=list, description="Dated milestones, oldest first")
+    market_trends: List[Trend] = Field(default_factory=list, description="Market figures and predictions")
+    challenges: List[Finding] = Field(default_factory=list, description="Challenges and their potential solutions")
+    references: List[str] = Field(default_factory=list, description="Research papers and sources")
+
+
+FINDINGS_FORMAT = json.dumps({
+    "topic": "...",
+    "summary": "...",
+    "developments": [{"title": "...", "summary": "..."}],
+    "key_players": [{"name": "...", "category": "...", "description": "..."}],
+    "technologies": [{"name": "...", "category": "...", "description": "..."}],
+    "relationships": [{"source": "...", "target": "...", "label": "..."}],
+    "timeline": [{"date": "YYYY", "event": "..."}],
+    "market_trends": [{"name": "...", "value": 0.0, "unit": "...", "period": "...", "description": "..."}],
+    "challenges": [{"title": "...", "summary": "..."}],
+    "references": ["..."],
+})
+
+
+def parse_findings(text):
+    """Validate research output against ResearchFindings, returning None if it does not conform"""
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        return None
+    try:
+        return ResearchFindings.model_validate_json(text[start:end + 1])
+    except ValidationError:
+        return None
+
+
+def _label(text, limit=60):
+    text = re.sub(r"[\"\[\]{}()<>|#;:`]", " ", str(text))
+    text = re.sub(r"\s+", " ", text).strip()
+    return text[:limit] or "?"
+
+
+def relationship_graph_inputs(findings):
+    """Nodes and edges for VisualizationTools.create_relationship_graph"""
+    nodes = [findings.topic] + [e.name for e in findings.key_players + findings.technologies]
+    edges = [(findings.topic, e.name) for e in findings.key_players + findings.technologies]
+    edges += [(r.source, r.target) for r in findings.relationships]
+    nodes += [name for edge in edges for name in edge]
+    return list(dict.fromkeys(nodes)), list(dict.fromkeys(edges))
+
+
+def concept_diagram(findings):
+    """Mermaid flowchart of the topic, its players, technologies and their relationships"""
+    nodes, edges = relationship_graph_inputs(findings)
+    ids = {name: f"n{i}" for i, name in enumerate(nodes)}
+    labels = {(r.source, r.target): r.label for r in findings.relationships}
+    lines = ["graph LR"]
+    lines += [f'    {ids[name]}["{_label(name)}"]' for name in nodes]
+    for source, target in edges:
+        label = _label(labels.get((source, target), ""), 30) if labels.get((source, target)) else ""
+        arrow = f" -->|{label}| " if label else " --> "
+        lines.append(f"    {ids[source]}{arrow}{ids[target]}")
+    return "\n".join(lines)
+
+
+def timeline_diagram(findings):
+    lines = ["timeline", f"    title {_label(findings.topic)}"]
+    lines += [f"    {_label(e.date, 20)} : {_label(e.event, 80)}" for e in findings.timeline]
+    return "\n".join(lines)
+
+
+def findings_visuals(findings):
+    """Deterministic markdown visuals built from structured findings, no LLM call needed"""
+    parts = ["## Visual Elements"]
+    if findings.key_players or findings.technologies or findings.relationships:
+        parts.append(f"### Key Concepts and Relationships\n\n```mermaid\n{concept_diagram(findings)}\n```")
+    if findings.timeline:
+        parts.append(f"### Timeline of Developments\n\n```mermaid\n{timeline_diagram(findings)}\n```")
+    if findings.market_trends:
+        rows = ["| Trend | Value | Period | Notes |", "| --- | --- | --- | --- |"]
+        for t in findings.market_trends:
+            value = f"{t.value:g} {t.unit}".strip() if t.value is not None else ""
+            rows.append(f"| {_label(t.name)} | {value} | {_label(t.period, 30)} | {_label(t.description, 120)} |")
+        parts.append("### Market Trends and Predictions\n\n" + "\n".join(rows))
+    return "\n\n".join(parts)
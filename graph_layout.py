@@ -0,0 +1,265 @@
+"""Layout and interactive rendering for relationship graphs too large for networkx drawing.
+
+Layouts are force-directed and fully vectorized with NumPy. Large graphs use a
+grid approximation for repulsion (each node is pushed by cell centroids instead
+of every other node) and a multilevel scheme: communities found by label
+propagation are laid out first, then nodes are refined around their community.
+"""
+import json
+
+import numpy as np
+
+EXACT_REPULSION_LIMIT = 2000
+MULTILEVEL_THRESHOLD = 5000
+_CHUNK_ELEMENTS = 1 << 21
+
+
+def index_graph(nodes, edges, weights=None):
+    """Map node names to integer ids and return (names, src, dst, weight) arrays"""
+    names = list(dict.fromkeys(nodes))
+    ids = {name: i for i, name in enumerate(names)}
+    for a, b in edges:
+        for name in (a, b):
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+    src = np.fromiter((ids[a] for a, _ in edges), dtype=np.int64, count=len(edges))
+    dst = np.fromiter((ids[b] for _, b in edges), dtype=np.int64, count=len(edges))
+    w = np.ones(len(edges)) if weights is None else np.asarray(weights, dtype=np.float64)
+    return names, src, dst, w
+
+
+def prune_edges(src, dst, w, max_edges=None, min_weight=None):
+    """Drop self-loops, merge duplicate edges and keep only the heaviest max_edges"""
+    keep = src != dst
+    if min_weight is not None:
+        keep &= w >= min_weight
+    lo, hi = np.minimum(src[keep], dst[keep]), np.maximum(src[keep], dst[keep])
+    n = int(max(hi.max(initial=0), lo.max(initial=0))) + 1
+    pairs, inverse = np.unique(lo * n + hi, return_inverse=True)
+    merged = np.bincount(inverse, weights=w[keep], minlength=len(pairs))
+    src, dst = pairs // n, pairs % n
+    if max_edges is not None and len(merged) > max_edges:
+        top = np.argpartition(-merged, max_edges - 1)[:max_edges]
+        src, dst, merged = src[top], dst[top], merged[top]
+    return src, dst, merged
+
+
+def label_propagation(n, src, dst, w, iterations=10, seed=0):
+    """Community labels by weighted label propagation, vectorized over all edges"""
+    rng = np.random.default_rng(seed)
+    labels = np.arange(n)
+    if len(src) == 0:
+        return labels
+    nodes = np.concatenate([src, dst])
+    neighbours = np.concatenate([dst, src])
+    weights = np.concatenate([w, w])
+    for _ in range(iterations):
+        keys = nodes * n + labels[neighbours]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights) + rng.random(len(unique_keys)) * 1e-6
+        owner, label = unique_keys // n, unique_keys % n
+        order = np.lexsort((-scores, owner))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = owner[order][1:] != owner[order][:-1]
+        best = np.full(n, -1)
+        best[owner[order][first]] = label[order][first]
+        update = (best >= 0) & (rng.random(n) < 0.5)
+        if not np.any(labels[update] != best[update]):
+            break
+        labels[update] = best[update]
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def detect_communities(n, src, dst, w, target=None, levels=6, seed=0):
+    """Repeat label propagation on the community graph until it stops shrinking or reaches target
+
+    target defaults to about sqrt(n) communities; a level that would overshoot it by half is discarded.
+    """
+    target = max(2, int(np.sqrt(n))) if target is None else target
+    labels = np.arange(n)
+    count, csrc, cdst, cw = n, src, dst, w
+    for level in range(levels):
+        level_labels = label_propagation(count, csrc, cdst, cw, iterations=20, seed=seed + level)
+        new_count = int(level_labels.max()) + 1 if count else 0
+        if new_count > 0.9 * count or new_count < target / 2:
+            break
+        labels = level_labels[labels]
+        _, csrc, cdst, cw = aggregate_communities(level_labels, csrc, cdst, cw)
+        count = new_count
+        if count <= target:
+            break
+    return labels
+
+
+def aggregate_communities(labels, src, dst, w):
+    """Collapse nodes into communities; returns sizes and the weighted community edges"""
+    sizes = np.bincount(labels)
+    csrc, cdst = labels[src], labels[dst]
+    return (sizes,) + prune_edges(csrc, cdst, w)
+
+
+def _repulsion(pos, k, exact):
+    n = len(pos)
+    disp = np.zeros_like(pos)
+    if n == 0:
+        return disp
+    if exact:
+        sources, mass = pos, np.ones(n)
+    else:
+        cells = min(32, max(4, int(np.sqrt(n) / 4)))
+        lo, hi = pos.min(axis=0), pos.max(axis=0)
+        cell = np.minimum(((pos - lo) / np.maximum(hi - lo, 1e-9) * cells).astype(np.int64), cells - 1)
+        flat = cell[:, 0] * cells + cell[:, 1]
+        mass = np.bincount(flat, minlength=cells * cells).astype(np.float64)
+        occupied = mass > 0
+        centroids = np.stack([np.bincount(flat, weights=pos[:, d], minlength=cells * cells) for d in (0, 1)], axis=1)
+        sources, mass = centroids[occupied] / mass[occupied, None], mass[occupied]
+    chunk = max(64, _CHUNK_ELEMENTS // len(sources))
+    sx, sy, strength = sources[:, 0], sources[:, 1], mass * k * k
+    floor = 1e-4 * k * k
+    for start in range(0, n, chunk):
+        dx = pos[start:start + chunk, 0, None] - sx
+        dy = pos[start:start + chunk, 1, None] - sy
+        force = dx * dx
+        force += dy * dy
+        np.maximum(force, floor, out=force)
+        np.divide(strength, force, out=force)
+        disp[start:start + chunk, 0] = np.einsum("ij,ij->i", dx, force)
+        disp[start:start + chunk, 1] = np.einsum("ij,ij->i", dy, force)
+    return disp
+
+
+def force_layout(n, src, dst, w=None, iterations=50, seed=0, initial=None, scale=1.0, temperature=None):
+    """Fruchterman-Reingold layout; exact repulsion for small graphs, grid-approximated for large ones"""
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2)) if initial is None else np.array(initial, dtype=np.float64)
+    if n <= 1:
+        return pos
+    w = np.ones(len(src)) if w is None else w / max(w.max(initial=0), 1e-12)
+    k = scale / np.sqrt(n)
+    temperature = 0.1 * scale if temperature is None else temperature
+    exact = n <= EXACT_REPULSION_LIMIT
+    for _ in range(iterations):
+        disp = _repulsion(pos, k, exact)
+        delta = pos[src] - pos[dst]
+        dist = np.maximum(np.linalg.norm(delta, axis=1), 1e-9)
+        pull = delta * (dist * w / k)[:, None]
+        for d in (0, 1):
+            disp[:, d] -= np.bincount(src, weights=pull[:, d], minlength=n)
+            disp[:, d] += np.bincount(dst, weights=pull[:, d], minlength=n)
+        length = np.maximum(np.linalg.norm(disp, axis=1), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature *= 0.95
+    return pos
+
+
+def multilevel_layout(n, src, dst, w, iterations=30, seed=0, refine=True):
+    """Lay out communities first, then refine each node around its community position"""
+    labels = detect_communities(n, src, dst, w, seed=seed)
+    sizes, csrc, cdst, cw = aggregate_communities(labels, src, dst, w)
+    coarse = force_layout(len(sizes), csrc, cdst, cw, iterations=iterations * 2, seed=seed)
+    if not refine:
+        return coarse, labels
+    rng = np.random.default_rng(seed)
+    spread = np.sqrt(sizes / n)[labels] * 0.5
+    initial = coarse[labels] + (rng.random((n, 2)) - 0.5) * spread[:, None]
+    refined = force_layout(n, src, dst, w, iterations=max(5, iterations // 3), seed=seed,
+                           initial=initial, temperature=0.02)
+    return refined, labels
+
+
+def layout_graph(nodes, edges, weights=None, max_edges=None, aggregate=None, iterations=50, seed=0):
+    """Compute a layout for a possibly very large graph
+
+    Returns a dict with node names, positions normalized to [0, 1], community labels,
+    node sizes and the (pruned) edge list. With aggregate=True, or by default above
+    MULTILEVEL_THRESHOLD nodes, each community is returned as a single node.
+    """
+    names, src, dst, w = index_graph(nodes, edges, weights)
+    n = len(names)
+    if n == 0:
+        return {"names": [], "pos": np.zeros((0, 2)), "labels": np.zeros(0, dtype=np.int64), "sizes": np.ones(0),
+                "src": src, "dst": dst, "weights": w}
+    if len(src):
+        src, dst, w = prune_edges(src, dst, w, max_edges)
+    aggregate = n > MULTILEVEL_THRESHOLD if aggregate is None else aggregate
+    sizes = np.ones(n)
+    if aggregate:
+        labels = detect_communities(n, src, dst, w, seed=seed)
+        counts = np.bincount(labels)
+        degree = np.bincount(np.concatenate([src, dst]), minlength=n)
+        representative = {}
+        for i in np.argsort(-degree, kind="stable"):
+            representative.setdefault(labels[i], names[i])
+        names = [f"{representative[c]} (+{counts[c] - 1})" if counts[c] > 1 else representative[c]
+                 for c in range(len(counts))]
+        sizes, src, dst, w = aggregate_communities(labels, src, dst, w)
+        labels = np.arange(len(counts))
+        pos = force_layout(len(counts), src, dst, w, iterations, seed)
+    elif n > MULTILEVEL_THRESHOLD:
+        pos, labels = multilevel_layout(n, src, dst, w, iterations, seed)
+    else:
+        pos, labels = force_layout(n, src, dst, w, iterations, seed), label_propagation(n, src, dst, w, seed=seed)
+    lo, hi = pos.min(axis=0), pos.max(axis=0)
+    pos = (pos - lo) / np.maximum(hi - lo, 1e-9)
+    return {"names": names, "pos": pos, "labels": labels, "sizes": sizes, "src": src, "dst": dst, "weights": w}
+
+
+_HTML = """<div id="graph" style="position:relative;width:100%;height:{height}px;background:#fff">
+<canvas style="width:100%;height:100%"></canvas>
+<div class="tip" style="position:absolute;pointer-events:none;font:12px sans-serif;background:#fffe;padding:2px 4px"></div></div>
+<script>
+(function() {{
+const data = {data};
+const root = document.getElementById("graph"), canvas = root.querySelector("canvas"), tip = root.querySelector(".tip");
+const ctx = canvas.getContext("2d");
+let scale = 1, ox = 0, oy = 0, drag = null;
+const palette = ["#1E88E5","#43A047","#FB8C00","#8E24AA","#E53935","#00ACC1","#6D4C41","#3949AB"];
+function size() {{ canvas.width = root.clientWidth; canvas.height = root.clientHeight; draw(); }}
+function sx(i) {{ return (data.x[i] * (canvas.width - 40) + 20) * scale + ox; }}
+function sy(i) {{ return (data.y[i] * (canvas.height - 40) + 20) * scale + oy; }}
+function draw() {{
+  ctx.clearRect(0, 0, canvas.width, canvas.height);
+  ctx.strokeStyle = "rgba(120,120,120,0.25)";
+  ctx.beginPath();
+  for (let e = 0; e < data.s.length; e++) {{ ctx.moveTo(sx(data.s[e]), sy(data.s[e])); ctx.lineTo(sx(data.t[e]), sy(data.t[e])); }}
+  ctx.stroke();
+  for (let i = 0; i < data.x.length; i++) {{
+    ctx.fillStyle = palette[data.g[i] % palette.length];
+    ctx.beginPath(); ctx.arc(sx(i), sy(i), data.r[i] * Math.sqrt(scale), 0, 6.283); ctx.fill();
+  }}
+}}
+canvas.addEventListener("wheel", ev => {{ ev.preventDefault(); const f = ev.deltaY < 0 ? 1.2 : 1 / 1.2;
+  ox = ev.offsetX - (ev.offsetX - ox) * f; oy = ev.offsetY - (ev.offsetY - oy) * f; scale *= f; draw(); }});
+canvas.addEventListener("mousedown", ev => {{ drag = [ev.offsetX - ox, ev.offsetY - oy]; }});
+window.addEventListener("mouseup", () => {{ drag = null; }});
+canvas.addEventListener("mousemove", ev => {{
+  if (drag) {{ ox = ev.offsetX - drag[0]; oy = ev.offsetY - drag[1]; draw(); return; }}
+  let best = -1, bestD = 100;
+  for (let i = 0; i < data.x.length; i++) {{ const d = (sx(i) - ev.offsetX) ** 2 + (sy(i) - ev.offsetY) ** 2; if (d < bestD) {{ best = i; bestD = d; }} }}
+  tip.style.display = best < 0 ? "none" : "block";
+  if (best >= 0) {{ tip.textContent = data.n[best]; tip.style.left = ev.offsetX + 8 + "px"; tip.style.top = ev.offsetY + 8 + "px"; }}
+}});
+window.addEventListener("resize", size); size();
+}})();
+</script>"""
+
+
+def graph_html(layout, height=600):
+    """Self-contained HTML canvas with pan, zoom and hover labels for a computed layout"""
+    sizes = np.asarray(layout["sizes"], dtype=np.float64)
+    radius = 2 + 8 * np.sqrt(sizes / sizes.max()) if len(sizes) else sizes
+    data = {
+        "n": [str(name) for name in layout["names"]],
+        "x": np.round(layout["pos"][:, 0], 4).tolist(),
+        "y": np.round(layout["pos"][:, 1], 4).tolist(),
+        "g": np.asarray(layout["labels"]).tolist(),
+        "r": np.round(radius, 1).tolist(),
+        "s": np.asarray(layout["src"]).tolist(),
+        "t": np.asarray(layout["dst"]).tolist(),
+    }
+    # Node names come from model and web text; escape what could close the <script> block
+    payload = json.dumps(data, separators=(",", ":")).replace("<", "\\u003c").replace(">", "\\u003e").replace("&", "\\u0026")
+    return _HTML.format(data=payload, height=height)
@@ -0,0 +1,246 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from admission import INTERACTIVE, get_admission_controller
+from search_cache import DEFAULT_CACHE_DIR, cache_key
+from streaming import ProgressEvent, ProgressStream
+
+LIVE_JOBS = 32
+HEARTBEAT_SECONDS = float(os.getenv("RESEARCH_JOB_HEARTBEAT", 10))
+# An owner that has not sent a heartbeat for this long is taken to be dead
+OWNER_TIMEOUT = 3 * HEARTBEAT_SECONDS
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+_REQUEUE = ("UPDATE jobs SET status = ?, owner = ?, error = NULL, started_at = NULL, finished_at = NULL "
+            "WHERE id = ? AND status = ?")
+
+# Progress events worth keeping after the job's in-memory log is gone
+_ARTIFACT_EVENTS = ("findings", "trace")
+
+
+def to_json(value):
+    return value.model_dump() if hasattr(value, "model_dump") else str(value)
+
+
+class JobProgress(ProgressStream):
+    """Progress stream that keeps every event, so any number of viewers can follow a job from the start"""
+
+    def __init__(self):
+        super().__init__()
+        self.log = []
+        self.artifacts = {}
+        self._changed = threading.Condition()
+
+    def emit(self, kind, content="", agent=""):
+        with self._changed:
+            self.log.append((kind, agent, content))
+            if kind in _ARTIFACT_EVENTS:
+                self.artifacts[kind] = content
+            self._changed.notify_all()
+
+    def since(self, cursor):
+        """Events logged after the first cursor ones, without waiting for more"""
+        with self._changed:
+            return [ProgressEvent(*event) for event in self.log[cursor:]]
+
+    def events(self, poll_interval=0.5):
+        """Yield all events so far, then new ones as they arrive, until the job finishes"""
+        cursor = 0
+        while True:
+            with self._changed:
+                while cursor >= len(self.log):
+                    self._changed.wait(poll_interval)
+                batch = self.log[cursor:]
+            cursor += len(batch)
+            for kind, agent, content in batch:
+                if kind == "done":
+                    return
+                yield ProgressEvent(kind, agent, content)
+
+
+class JobQueue:
+    """SQLite-backed research job queue whose runs are admitted by an AdmissionController
+
+    Submitting charges the user's rate limit and may raise AdmissionRejected. Each job
+    then waits on its own thread for a run slot, so the controller decides both how
+    many jobs run at once and in which order by priority.
+
+    Submitting a topic that is already queued or running with the same parameters
+    returns the existing job instead of starting a duplicate, and resubmitting one
+    whose last attempt failed resumes it. Several processes may share one queue file:
+    each job is owned by the queue that runs it, queues record a heartbeat while they
+    are alive, and on startup a queue takes over only the unfinished jobs whose owner
+    has stopped sending heartbeats. The runner is called as
+    runner(topic, progress, run_id=job_id, **params), so it can checkpoint by job id.
+    """
+
+    def __init__(self, runner, path=None, admission=None, recover=True):
+        self.runner = runner
+        self.admission = admission or get_admission_controller()
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "jobs.sqlite3")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, key TEXT NOT NULL, topic TEXT NOT NULL, params TEXT NOT NULL, "
+            "status TEXT NOT NULL, result TEXT, error TEXT, artifacts TEXT, "
+            "created_at REAL NOT NULL, started_at REAL, finished_at REAL, "
+            "user TEXT NOT NULL DEFAULT '', priority INTEGER NOT NULL DEFAULT 0, owner TEXT NOT NULL DEFAULT '')"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key_status ON jobs (key, status)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS owners (id TEXT PRIMARY KEY, heartbeat REAL NOT NULL)")
+        self.owner = uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._live = OrderedDict()
+        self._heartbeat()
+        threading.Thread(target=self._keep_alive, name=f"research-jobs-{self.owner}", daemon=True).start()
+        if recover:
+            self._recover()
+
+    def _heartbeat(self):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO owners (id, heartbeat) VALUES (?, ?)", (self.owner, time.time()))
+
+    def _keep_alive(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            self._heartbeat()
+
+    def _recover(self):
+        """Take over the unfinished jobs of queues that stopped sending heartbeats"""
+        cutoff = time.time() - OWNER_TIMEOUT
+        recovered = []
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, owner FROM jobs WHERE status IN (?, ?) AND owner NOT IN "
+                "(SELECT id FROM owners WHERE heartbeat >= ?) ORDER BY created_at", (*ACTIVE, cutoff)).fetchall()
+            for job_id, owner in rows:
+                # Another queue starting at the same time may have claimed the job first
+                if self._conn.execute("UPDATE jobs SET status = ?, started_at = NULL, owner = ? WHERE id = ? AND owner = ?",
+                                      (QUEUED, self.owner, job_id, owner)).rowcount:
+                    recovered.append(job_id)
+            self._conn.execute("DELETE FROM owners WHERE heartbeat < ?", (cutoff,))
+        for job_id in recovered:
+            self._start(job_id)
+
+    def _start(self, job_id):
+        progress = JobProgress()
+        with self._lock:
+            self._live[job_id] = progress
+            while len(self._live) > LIVE_JOBS:
+                self._live.popitem(last=False)
+        progress.markdown('<p class="status progress">Queued...</p>')
+        threading.Thread(target=self._run, args=(job_id, progress), name=f"research-job-{job_id}", daemon=True).start()
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _run(self, job_id, progress):
+        job = self.get(job_id)
+        with self.admission.slot(job["priority"]):
+            self._update(job_id, status=RUNNING, started_at=time.time())
+            progress.call(self.runner, job["topic"], progress, run_id=job_id, **job["params"])
+        artifacts = json.dumps(progress.artifacts, default=to_json)
+        if progress.error is None:
+            self._update(job_id, status=DONE, result=progress.result, artifacts=artifacts, finished_at=time.time())
+        else:
+            error = f"{type(progress.error).__name__}: {progress.error}"
+            self._update(job_id, status=FAILED, error=error, artifacts=artifacts, finished_at=time.time())
+
+    def submit(self, topic, user="", priority=INTERACTIVE, **params):
+        """Queue a research job for user and return its id
+
+        An identical job still in flight is returned as it is, without charging the
+        user; the latest identical job that failed is resumed rather than started over,
+        under the resubmitting user and priority.
+        """
+        key = cache_key(topic, **params)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, status FROM jobs WHERE key = ? AND status IN (?, ?, ?) ORDER BY created_at DESC",
+                (key, *ACTIVE, FAILED)).fetchone()
+            if row is not None and row[1] in ACTIVE:
+                return row[0]
+            self.admission.check(user)
+            if row is not None:
+                job_id = row[0]
+                self._conn.execute(_REQUEUE, (QUEUED, self.owner, job_id, FAILED))
+                # The resubmitting user now owns the run and its priority decides its slot
+                self._conn.execute("UPDATE jobs SET user = ?, priority = ? WHERE id = ?", (user, priority, job_id))
+            else:
+                job_id = uuid.uuid4().hex[:12]
+                self._conn.execute(
+                    "INSERT INTO jobs (id, key, topic, params, status, created_at, user, priority, owner) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, key, topic, json.dumps(params), QUEUED, time.time(), user, priority, self.owner))
+        self._start(job_id)
+        return job_id
+
+    def resume(self, job_id):
+        """Queue a failed job again under the same id, returning False if it had not failed"""
+        with self._lock, self._conn:
+            resumed = self._conn.execute(_REQUEUE, (QUEUED, self.owner, job_id, FAILED)).rowcount
+        if resumed:
+            self._start(job_id)
+        return bool(resumed)
+
+    def get(self, job_id):
+        """Return the stored job as a dict, or None if the id is unknown"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            job = dict(zip([column[0] for column in cursor.description], row))
+        job["params"] = json.loads(job["params"])
+        job["artifacts"] = json.loads(job["artifacts"]) if job["artifacts"] else {}
+        return job
+
+    def progress(self, job_id):
+        """Live progress of a job started by this process, or None"""
+        with self._lock:
+            return self._live.get(job_id)
+
+    def wait(self, job_id, timeout=None, poll_interval=0.5):
+        """Poll until the job finishes or timeout expires, and return it"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] not in ACTIVE:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in (QUEUED, RUNNING, DONE, FAILED)}
+
+
+_shared_queue = None
+_shared_lock = threading.Lock()
+
+
+def get_job_queue(runner=None):
+    """Return the process-wide job queue, creating it with runner on first use"""
+    global _shared_queue
+    with _shared_lock:
+        if _shared_queue is None:
+            if runner is None:
+                raise RuntimeError("the job queue has not been created yet")
+            _shared_queue = JobQueue(runner)
+        return _shared_queue
@@ -0,0 +1,264 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from retry import call_with_retries, is_transient_error
+from streaming import current_token_sink
+from telemetry import llm_usage, record, trace_span
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 2000))
+DEFAULT_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", 0)) or None
+FAKE_LLM = os.getenv("RESEARCH_FAKE_LLM", "").lower() in ("1", "true", "yes")
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", 2))
+
+
+def messages_to_prompt(messages):
+    """Flatten a chat message list into a single prompt string"""
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+
+
+class HashingEmbedder:
+    """Local bag-of-words embedding using the hashing trick, no model download required"""
+
+    def __init__(self, dim=512):
+        self.dim = dim
+
+    def __call__(self, text):
+        tokens = re.findall(r"\w+", text.lower())
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for gram in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dim
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticLLMCache:
+    """Bounded completion cache with exact lookup and optional cosine-similarity lookup
+
+    Entries live in namespaces (the model and sampling parameters of the call), and a
+    prompt only ever matches entries of its own namespace.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, similarity_threshold=DEFAULT_SIMILARITY, embedder=None):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashingEmbedder()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._matrix = None
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._slot_keys = [None] * max_entries
+        self._slot_namespaces = np.full(max_entries, -1, dtype=np.int64)
+        self._namespace_ids = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(prompt, namespace=""):
+        return hashlib.sha256(f"{namespace}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt, namespace=""):
+        """Return a cached completion for the prompt within namespace, or None on a miss"""
+        key = self._key(prompt, namespace)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return self._entries[key][1]
+            if self.similarity_threshold and self._matrix is not None and self._valid.any():
+                scores = self._matrix @ self.embedder(prompt)
+                scores[~self._valid | (self._slot_namespaces != self._namespace_ids.get(namespace, -1))] = -1.0
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    match = self._slot_keys[best]
+                    self._entries.move_to_end(match)
+                    self.semantic_hits += 1
+                    return self._entries[match][1]
+            self.misses += 1
+            return None
+
+    def store(self, prompt, completion, namespace=""):
+        """Store a completion, evicting the least recently used entry when full"""
+        key = self._key(prompt, namespace)
+        vector = self.embedder(prompt) if self.similarity_threshold else None
+        with self._lock:
+            if key in self._entries:
+                slot = self._entries[key][0]
+                self._entries.move_to_end(key)
+            else:
+                if not self._free_slots:
+                    _, (old_slot, _) = self._entries.popitem(last=False)
+                    self._valid[old_slot] = False
+                    self._free_slots.append(old_slot)
+                slot = self._free_slots.pop()
+            self._entries[key] = (slot, completion)
+            self._slot_keys[slot] = key
+            self._slot_namespaces[slot] = self._namespace_ids.setdefault(namespace, len(self._namespace_ids))
+            if vector is not None:
+                if self._matrix is None:
+                    self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._matrix[slot] = vector
+                self._valid[slot] = True
+
+    def complete(self, messages, call, namespace=""):
+        """Return a cached completion for messages, falling back to call() on a miss"""
+        prompt = messages_to_prompt(messages)
+        cached = self.lookup(prompt, namespace)
+        if cached is not None:
+            return cached
+        completion = call()
+        if completion:
+            self.store(prompt, completion, namespace)
+        return completion
+
+    def stats(self):
+        hits = self.exact_hits + self.semantic_hits
+        total = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+class FakeLLM:
+    """Offline stand-in for a chat model that answers deterministically after a fixed latency"""
+
+    def __init__(self, latency=0.5):
+        self.latency = latency
+        self.calls = 0
+
+    def call(self, messages, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        prompt = messages_to_prompt(messages)
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        return f"Thought: I now know the final answer\nFinal Answer: Offline response {digest}"
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Return the process-wide LLM response cache"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SemanticLLMCache()
+        return _shared_cache
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_llm_class():
+    from crewai import LLM
+
+    class CachedLLM(LLM):
+        def __init__(self, *args, cache=None, fake=FAKE_LLM, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.cache = cache or get_llm_cache()
+            # fake may be a flag or any object with call(messages), such as a replay backend
+            self.fake_llm = fake if hasattr(fake, "call") else (FakeLLM() if fake else None)
+
+        def cache_namespace(self, tools=None):
+            """The model and sampling parameters a cached completion must have been produced with"""
+            return json.dumps({
+                "model": self.model,
+                "temperature": self.temperature,
+                "top_p": self.top_p,
+                "max_tokens": self.max_tokens or self.max_completion_tokens,
+                "stop": self.stop,
+                "seed": self.seed,
+                "response_format": self.response_format,
+                "params": self.additional_params,
+                "tools": sorted(str(tool.get("function", {}).get("name", tool)) if isinstance(tool, dict) else str(tool)
+                                for tool in tools or []),
+            }, sort_keys=True, default=str)
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None):
+            sink = current_token_sink()
+            if sink is not None:
+                sink.llm_start()
+            streamed = []
+            called = []
+
+            def request():
+                if self.fake_llm is not None:
+                    return self.fake_llm.call(messages)
+                if sink is not None and not tools:
+                    streamed.append(True)
+                    return self._stream(messages, sink, callbacks)
+                return super(CachedLLM, self).call(messages, tools, callbacks, available_functions)
+
+            def backend():
+                called.append(True)
+                return call_with_retries(request, retries=LLM_RETRIES, retry_on=is_transient_error,
+                                         on_retry=lambda *_: record("retries"))
+
+            with trace_span("llm", "llm", model=self.model) as span:
+                completion = self.cache.complete(messages, backend, self.cache_namespace(tools))
+                if span is not None:
+                    span.set(cache_hit=not called)
+                    if called:
+                        span.set(**llm_usage(self.model, messages, completion))
+            if sink is not None and not streamed:
+                sink.token(completion)
+            return completion
+
+        def _stream(self, messages, sink, callbacks=None):
+            import litellm
+
+            if isinstance(messages, str):
+                messages = [{"role": "user", "content": messages}]
+            params = {
+                "model": self.model,
+                "messages": self._format_messages_for_provider(messages),
+                "timeout": self.timeout,
+                "temperature": self.temperature,
+                "top_p": self.top_p,
+                "stop": self.stop,
+                "max_tokens": self.max_tokens or self.max_completion_tokens,
+                "seed": self.seed,
+                "api_base": self.api_base,
+                "base_url": self.base_url,
+                "api_version": self.api_version,
+                "api_key": self.api_key,
+                "stream_options": {"include_usage": True},
+                **self.additional_params,
+            }
+            params = {k: v for k, v in params.items() if v is not None}
+            chunks = []
+            usage = None
+            for chunk in litellm.completion(stream=True, **params):
+                usage = getattr(chunk, "usage", None) or usage
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    chunks.append(text)
+                    sink.token(text)
+            for callback in callbacks or []:
+                if usage and hasattr(callback, "log_success_event"):
+                    callback.log_success_event(kwargs=params, response_obj={"usage": usage},
+                                               start_time=0, end_time=0)
+            return "".join(chunks)
+
+    return CachedLLM
+
+
+def cached_llm(model, cache=None, **kwargs):
+    """Return a CrewAI LLM whose completions are served from the response cache"""
+    return _cached_llm_class()(model=model, cache=cache, **kwargs)
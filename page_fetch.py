@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+from collections import Counter, namedtuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from search_cache import DEFAULT_CACHE_DIR, HTTP_POOL_SIZE, SearchCache
+from telemetry import trace_span
+
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", 7 * 24 * 3600))
+PAGE_FETCH_RESULTS = int(os.getenv("SEARCH_FETCH_PAGES", 3))
+PAGE_FETCH_CONCURRENCY = int(os.getenv("PAGE_FETCH_CONCURRENCY", 8))
+PAGE_FETCH_TIMEOUT = float(os.getenv("PAGE_FETCH_TIMEOUT", 10))
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", 2 * 1024 * 1024))
+PAGE_MAX_CHARS = int(os.getenv("PAGE_MAX_CHARS", 20000))
+PAGE_TOKENS = int(os.getenv("PAGE_TOKENS", 800))
+# Pages whose 64-bit SimHashes differ in at most this many bits are treated as copies. Web-scale
+# indexes use about 3; among a handful of results, syndicated copies with their own chrome and an
+# edited sentence land within 10 bits while unrelated pages sit near 32.
+SIMHASH_DISTANCE = 10
+
+USER_AGENT = "Mozilla/5.0 (compatible; research-agent/1.0)"
+
+Document = namedtuple("Document", ["url", "title", "text", "fingerprint"])
+
+_WORD = re.compile(r"\w+")
+_TRACKING = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref)$")
+_BOILERPLATE = ("script", "style", "noscript", "template", "svg", "canvas", "iframe", "form", "button",
+                "nav", "header", "footer", "aside")
+_TEXT_TAGS = ("h1", "h2", "h3", "h4", "p", "li", "pre", "blockquote", "td", "dd")
+_MIN_WORDS = 4
+
+
+def normalize_url(url):
+    """Canonical form of url for caching and deduplication: no fragment or tracking parameters"""
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _TRACKING.match(k)])
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def _densest(soup):
+    """The element holding the most paragraph text, a stand-in for an untagged main column"""
+    totals, elements = Counter(), {}
+    for paragraph in soup.find_all("p"):
+        parent = paragraph.parent
+        if parent is not None:
+            totals[id(parent)] += len(paragraph.get_text(strip=True))
+            elements[id(parent)] = parent
+    return elements[totals.most_common(1)[0][0]] if totals else None
+
+
+def extract_text(html, max_chars=PAGE_MAX_CHARS):
+    """Return (title, text) of the main content of an HTML page
+
+    Navigation, headers, footers, forms and scripts are removed, and text is taken
+    from the page's <article> or <main> element, else from the element with the most
+    paragraph text. Headings are kept as markdown headings; lines of fewer than four
+    words (share buttons, bylines, "Read more") are dropped.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    title = " ".join(soup.title.get_text(" ", strip=True).split()) if soup.title else ""
+    for tag in soup(_BOILERPLATE):
+        tag.decompose()
+    root = soup.find("article") or soup.find("main") or _densest(soup) or soup.body or soup
+    lines = []
+    for element in root.find_all(_TEXT_TAGS):
+        if element.find(_TEXT_TAGS):
+            continue
+        text = " ".join(element.get_text(" ", strip=True).split())
+        if element.name[0] == "h" and element.name[1:].isdigit():
+            line = f"{'#' * int(element.name[1:])} {text}" if text else ""
+        else:
+            line = text if len(text.split()) >= _MIN_WORDS else ""
+        if line and (not lines or lines[-1] != line):
+            lines.append(line)
+    if not lines:
+        lines = [" ".join(line.split()) for line in root.get_text("\n").splitlines() if len(line.split()) >= _MIN_WORDS]
+    return title, "\n".join(lines)[:max_chars]
+
+
+def simhash(text, bits=64):
+    """SimHash fingerprint of text over word trigrams, weighted by how often each occurs"""
+    import numpy as np
+
+    words = _WORD.findall(text.lower())
+    shingles = Counter(" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2)))
+    hashes = np.array([int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+                       for shingle in shingles], dtype=np.uint64)
+    set_bits = (hashes[:, None] >> np.arange(bits, dtype=np.uint64)) & np.uint64(1)
+    weights = np.fromiter(shingles.values(), dtype=np.int64, count=len(shingles)) @ (2 * set_bits.astype(np.int64) - 1)
+    return sum(1 << bit for bit in np.flatnonzero(weights > 0).tolist())
+
+
+def dedupe_documents(documents, max_distance=SIMHASH_DISTANCE):
+    """Drop documents whose fingerprint is within max_distance bits of an earlier one"""
+    kept = []
+    for document in documents:
+        if all((document.fingerprint ^ other.fingerprint).bit_count() > max_distance for other in kept):
+            kept.append(document)
+    return kept
+
+
+class PageFetcher:
+    """Concurrent page downloads with extracted text cached on disk
+
+    Downloads run on a private event loop thread that owns one httpx.AsyncClient, so
+    keep-alive connections are reused across calls from any thread. Only extracted
+    documents are cached; failed downloads are tried again next time.
+    """
+
+    def __init__(self, cache=None, concurrency=PAGE_FETCH_CONCURRENCY, timeout=PAGE_FETCH_TIMEOUT,
+                 max_bytes=PAGE_MAX_BYTES, transport=None):
+        self.cache = cache or SearchCache(
+            path=os.path.join(DEFAULT_CACHE_DIR, "pages.sqlite3"), ttl=PAGE_CACHE_TTL, table="pages")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.transport = transport
+        self.fetched = 0
+        self.failed = 0
+        self.duplicates = 0
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    def _event_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="page-fetch", daemon=True).start()
+            return self._loop
+
+    def _http_client(self):
+        import httpx
+
+        if self._client is None:
+            limits = httpx.Limits(max_connections=HTTP_POOL_SIZE, max_keepalive_connections=HTTP_POOL_SIZE)
+            self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout, follow_redirects=True,
+                                             headers={"User-Agent": USER_AGENT}, transport=self.transport)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._client
+
+    async def _download(self, url):
+        client = self._http_client()
+        async with self._semaphore:
+            try:
+                async with client.stream("GET", url) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get("content-type", "text/html").lower()
+                    if "html" not in content_type and not content_type.startswith("text/"):
+                        return None
+                    body = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        body += chunk
+                        if len(body) >= self.max_bytes:
+                            break
+                    html = body.decode(response.encoding or "utf-8", errors="replace")
+            except Exception:
+                return None
+        return await asyncio.to_thread(self._extract, url, html)
+
+    @staticmethod
+    def _extract(url, html):
+        title, text = extract_text(html)
+        return Document(url, title, text, simhash(text)) if text else None
+
+    async def _download_all(self, urls):
+        return await asyncio.gather(*(self._download(url) for url in urls))
+
+    def fetch(self, urls):
+        """Extracted documents for urls, in order, without failures and near-duplicate pages"""
+        urls = list(dict.fromkeys(normalize_url(url) for url in urls if url))
+        with trace_span("page_fetch", "tool", urls=len(urls)) as span:
+            found = {url: self.cache.get(url) for url in urls}
+            missing = [url for url in urls if found[url] is None]
+            failed = 0
+            if missing:
+                future = asyncio.run_coroutine_threadsafe(self._download_all(missing), self._event_loop())
+                for url, document in zip(missing, future.result()):
+                    if document is None:
+                        failed += 1
+                        continue
+                    found[url] = document._asdict()
+                    self.cache.set(url, found[url])
+            documents = [Document(**found[url]) for url in urls if found[url] is not None]
+            unique = dedupe_documents(documents)
+            with self._lock:
+                self.fetched += len(missing) - failed
+                self.failed += failed
+                self.duplicates += len(documents) - len(unique)
+            if span is not None:
+                span.set(cache_hits=len(urls) - len(missing), failed=failed, duplicates=len(documents) - len(unique))
+        return unique
+
+    def stats(self):
+        with self._lock:
+            return {"fetched": self.fetched, "failed": self.failed, "duplicates": self.duplicates,
+                    "cached": self.cache.stats()["entries"]}
+
+
+def attach_pages(results, fetcher, count=PAGE_FETCH_RESULTS, tokens=PAGE_TOKENS):
+    """Add the extracted text of the top count organic results to a Serper response
+
+    Each page is summarized to about tokens tokens, and copies of a page already
+    attached are left out, so one search call gives the agent the pages' substance.
+    """
+    if not count or not isinstance(results, dict) or not isinstance(results.get("organic"), list):
+        return results
+    from compaction import summarize
+
+    links = [item.get("link") for item in results["organic"] if isinstance(item, dict) and item.get("link")]
+    documents = fetcher.fetch(links[:count])
+    pages = [{"link": document.url, "title": document.title, "content": summarize(document.text, tokens)}
+             for document in documents]
+    return {**results, "pages": pages} if pages else results
+
+
+_shared_fetcher = None
+_shared_lock = threading.Lock()
+
+
+def get_page_fetcher():
+    """Return the process-wide page fetcher"""
+    global _shared_fetcher
+    with _shared_lock:
+        if _shared_fetcher is None:
+            _shared_fetcher = PageFetcher()
+        return _shared_fetcher
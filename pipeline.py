@@ -0,0 +1,128 @@
+import asyncio
+import os
+import tempfile
+from datetime import datetime
+
+from async_pipeline import ParallelResearchPipeline
+from compaction import DEFAULT_MODEL, compact_context
+from crew_factory import create_research_tasks
+from streaming import ProgressStream, agent_context
+from telemetry import step_span_callback, trace_span
+
+
+def run_report_pipeline(topic, status_placeholder, agents, parallel=False, max_concurrency=3, citations=None,
+                        verbose=True, store=None, budget=None, checkpoints=None, refresh=False):
+    """Run the research, visualization and writing steps on a borrowed set of agents
+
+    With a report store, sections of an earlier report on the same topic, written with
+    the same model, context budget and citations, that are still fresh are reused and
+    the finished report is saved back; refresh researches every section again. With a
+    context budget, the output each task hands on is compacted to that many tokens.
+    With checkpoints, tasks completed by an earlier attempt of the run are not run again.
+    """
+    from crewai import Crew, Process
+    from crewai.tasks.task_output import TaskOutput
+    from findings import findings_visuals, parse_findings
+
+    researcher, visualizer, writer = agents
+    model = getattr(researcher.llm, "model", DEFAULT_MODEL)
+    run_params = {"model": model, "budget": list(budget) if budget else None, "citations": bool(citations)}
+    streaming = isinstance(status_placeholder, ProgressStream)
+    for agent in (researcher, visualizer, writer):
+        callbacks = [step_span_callback(agent.role)]
+        if streaming:
+            callbacks.append(status_placeholder.step_callback(agent.role))
+        agent.step_callback = lambda step, callbacks=callbacks: [callback(step) for callback in callbacks]
+
+    if parallel:
+        prior = store.fresh_sections(topic, "parallel", params=run_params) if store and not refresh else {}
+        status_placeholder.markdown('<p class="status progress">Researching subtopics in parallel...</p>', unsafe_allow_html=True)
+        pipeline = ParallelResearchPipeline(researcher, visualizer, writer, max_concurrency,
+                                            on_section=status_placeholder.section_callback if streaming else None,
+                                            citations=citations, prior=prior, budget=budget, model=model,
+                                            checkpoints=checkpoints)
+        with trace_span("parallel_research", "stage", max_concurrency=max_concurrency) as span:
+            report_content = asyncio.run(pipeline.run(topic))
+            if span is not None:
+                span.set(reused_sections=len(pipeline.sections) - len(pipeline.refreshed))
+        if store:
+            store.save(topic, report_content, "parallel", pipeline.sections, pipeline.refreshed, run_params)
+        status_placeholder.markdown('<p class="status success">Research completed successfully!</p>', unsafe_allow_html=True)
+        return report_content
+
+    stored = store.load(topic, params=run_params) if store and not refresh else None
+    if stored is not None:
+        fresh = store.fresh_sections(topic, params=run_params)
+        if all(section.heading in fresh for section in stored.sections):
+            researched = datetime.fromtimestamp(stored.updated_at).strftime('%Y-%m-%d %H:%M')
+            status_placeholder.markdown(f'<p class="status success">Reusing the report researched on {researched}</p>', unsafe_allow_html=True)
+            return stored.content
+
+    research_task, visualization_task, writing_task = create_research_tasks(
+        topic, researcher, visualizer, writer, citations)
+    task_callback = status_placeholder.task_callback if streaming else None
+    full_outputs = {}
+
+    def compact_inputs(stage, task, tokens):
+        """Hand task a compacted copy of its context tasks' outputs, keeping the originals"""
+        if budget is None:
+            return
+        with trace_span("compaction", "stage", task=stage, budget=tokens):
+            outputs = [full_outputs.setdefault(id(context), context.output) for context in task.context]
+            texts = compact_context([output.raw for output in outputs], tokens, model)
+            for context, output, text in zip(task.context, outputs, texts):
+                context.output = output.model_copy(update={"raw": text})
+
+    def run_crew(stage, task):
+        saved = checkpoints.get(stage) if checkpoints else None
+        if saved is not None:
+            with trace_span(stage, "stage", resumed=True):
+                task.output = TaskOutput(description=task.description, raw=saved, agent=task.agent.role)
+            if task_callback:
+                task_callback(task.output)
+            return task.output
+        with trace_span(stage, "stage"), agent_context(task.agent.role):
+            crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=verbose,
+                        task_callback=task_callback)
+            result = crew.kickoff(inputs={'topic': topic})
+        if checkpoints:
+            checkpoints.save(stage, task.output.raw)
+        return result
+
+    status_placeholder.markdown('<p class="status progress">Starting the research process...</p>', unsafe_allow_html=True)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_file = os.path.join(temp_dir, f"research_report_{datetime.now().strftime('%Y%m%d')}.md")
+        writing_task.output_file = output_file
+
+        status_placeholder.markdown('<p class="status progress">Research in progress...</p>', unsafe_allow_html=True)
+        run_crew("research", research_task)
+
+        # Validated findings are visualized without another LLM round trip;
+        # unparseable output falls back to the visualization agent.
+        findings = parse_findings(research_task.output.raw)
+        if findings is not None:
+            with trace_span("visualization", "stage", deterministic=True):
+                visualization_task.output = TaskOutput(description=visualization_task.description,
+                                                       raw=findings_visuals(findings), agent=visualizer.role)
+            if streaming:
+                status_placeholder.emit("findings", findings)
+                task_callback(visualization_task.output)
+        else:
+            compact_inputs("visualization", visualization_task, budget and budget.visualization)
+            run_crew("visualization", visualization_task)
+
+        compact_inputs("writing", writing_task, budget and budget.writing)
+        result = run_crew("writing", writing_task)
+
+        if os.path.exists(output_file):
+            with open(output_file, 'r') as f:
+                report_content = f.read()
+        else:
+            report_content = str(result)
+
+    if store:
+        store.save(topic, report_content, params=run_params)
+    status_placeholder.markdown('<p class="status success">Research completed successfully!</p>', unsafe_allow_html=True)
+
+    return report_content
@@ -0,0 +1,136 @@
+import functools
+import hashlib
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+# kind is text, mermaid, latex (block) or inline_latex; content is the raw slice and body its inner code
+Section = namedtuple("Section", ["kind", "content", "body"])
+
+TEXT = "text"
+MERMAID = "mermaid"
+BLOCK_LATEX = "latex"
+INLINE_LATEX = "inline_latex"
+
+# Inline math stays on one line, opens on a non-space and closes on a non-space not followed
+# by a digit, so prices such as "$5 to $10" stay text
+_BLOCKS = re.compile(r"```mermaid(.*?)```|```.*?```|\$\$(.*?)\$\$|\$(?!\s)([^$\n]+?)(?<!\s)\$(?!\d)", re.DOTALL)
+# Where a block still being streamed may begin. A single dollar only opens math on the line
+# being streamed, and not before a digit or space, where it is a price.
+_OPENERS = re.compile(r"```|\$\$|\$(?![\d\s])(?=[^\n]*\Z)")
+_CACHE_SIZE = 32
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def tokenize(content):
+    """Split content into sections in one left-to-right pass
+
+    Returns the sections and the offset of the first unclosed fence or math opener, if any.
+    Code fences other than mermaid stay in text and their contents are never read as LaTeX.
+    """
+    sections = []
+    text_start = 0
+    last_end = 0
+    for match in _BLOCKS.finditer(content):
+        start, end = match.span()
+        last_end = end
+        mermaid, block, inline = match.groups()
+        if mermaid is None and block is None and inline is None:
+            continue
+        if start > text_start:
+            sections.append(Section(TEXT, content[text_start:start], content[text_start:start]))
+        if mermaid is not None:
+            sections.append(Section(MERMAID, match.group(), mermaid.strip()))
+        elif block is not None:
+            sections.append(Section(BLOCK_LATEX, match.group(), block.strip()))
+        else:
+            sections.append(Section(INLINE_LATEX, match.group(), inline))
+        text_start = end
+
+    if len(content) > text_start:
+        sections.append(Section(TEXT, content[text_start:], content[text_start:]))
+    opener = _OPENERS.search(content, last_end)
+    return sections, opener.start() if opener else None
+
+
+class ParsedReport:
+    """Sections of a report plus the views each report tab needs, computed once"""
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    @functools.cached_property
+    def blocks(self):
+        return render_blocks(self.sections)
+
+    @functools.cached_property
+    def mermaid_diagrams(self):
+        return mermaid_diagrams(self.sections)
+
+    @functools.cached_property
+    def latex_equations(self):
+        return latex_equations(self.sections)
+
+
+def parse_report(content):
+    """Return the parsed report, cached by content hash"""
+    key = hashlib.sha1(content.encode("utf-8")).hexdigest()
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    parsed = ParsedReport(tuple(tokenize(content)[0]))
+    with _cache_lock:
+        _cache[key] = parsed
+        if len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return parsed
+
+
+def stable_prefix_length(content):
+    """Length of the prefix that ends on a complete paragraph or block, for streaming renders"""
+    sections, open_at = tokenize(content)
+    limit = len(content) if open_at is None else open_at
+    block_end = 0
+    offset = 0
+    for section in sections:
+        start, offset = offset, offset + len(section.content)
+        if offset > limit:
+            break
+        if section.kind in (MERMAID, BLOCK_LATEX):
+            block_end = offset
+        elif section.kind == TEXT and "```" in section.content:
+            block_end = start + section.content.rfind("```") + 3
+    boundary = content.rfind("\n\n", block_end, limit)
+    return max(block_end, boundary + 2 if boundary != -1 else 0)
+
+
+def render_blocks(sections):
+    """Group sections into render blocks: markdown (text with inline LaTeX), mermaid and latex"""
+    blocks = []
+    markdown = []
+    for section in sections:
+        if section.kind == TEXT:
+            markdown.append(section.content)
+        elif section.kind == INLINE_LATEX:
+            markdown.append(f"\\({section.body}\\)")
+        else:
+            if markdown:
+                blocks.append(("markdown", "".join(markdown)))
+                markdown = []
+            blocks.append((section.kind, section.body))
+    if markdown:
+        blocks.append(("markdown", "".join(markdown)))
+    return blocks
+
+
+def mermaid_diagrams(sections):
+    return [s.body for s in sections if s.kind == MERMAID]
+
+
+def latex_equations(sections):
+    return {
+        "inline": [s.body for s in sections if s.kind == INLINE_LATEX],
+        "block": [s.body for s in sections if s.kind == BLOCK_LATEX],
+    }
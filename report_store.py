@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from search_cache import DEFAULT_CACHE_DIR, normalize_query
+
+SECTION_MAX_AGE = float(os.getenv("REPORT_SECTION_MAX_AGE", 7 * 24 * 3600))
+
+StoredSection = namedtuple("StoredSection", ["heading", "content", "researched_at"])
+StoredReport = namedtuple("StoredReport", ["id", "topic", "layout", "params", "content", "content_hash",
+                                           "created_at", "updated_at", "sections"])
+
+_HEADING = re.compile(r"^##\s+(.+?)\s*#*\s*$")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def split_sections(content):
+    """Split a markdown report into (heading, content) chunks at level-two headings
+
+    Text before the first heading is kept under an empty heading. Headings inside
+    code fences do not start a section.
+    """
+    sections = []
+    heading, lines = "", []
+    in_fence = False
+    for line in content.splitlines(keepends=True):
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            if heading or "".join(lines).strip():
+                sections.append((heading, "".join(lines).strip()))
+            heading, lines = match.group(1), []
+        lines.append(line)
+    if heading or "".join(lines).strip():
+        sections.append((heading, "".join(lines).strip()))
+    return sections
+
+
+def params_key(params):
+    """Canonical text of the run parameters a report was generated with"""
+    return json.dumps(params or {}, sort_keys=True)
+
+
+def _match_query(query):
+    """Quote each word so user input is never parsed as FTS5 syntax"""
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in query.split())
+
+
+class ReportStore:
+    """SQLite store of finished reports, chunked into sections with a full-text index
+
+    Each section remembers when it was last researched, so a report on a known topic
+    can be refreshed by redoing only the sections older than max_age. Reports are
+    kept per topic, layout and the parameters of the run that generated them, so a
+    run only reuses sections written under the same settings.
+    """
+
+    def __init__(self, path=None, max_age=SECTION_MAX_AGE):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "reports.sqlite3")
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS reports (
+                    id INTEGER PRIMARY KEY,
+                    topic TEXT,
+                    topic_key TEXT,
+                    layout TEXT,
+                    params TEXT NOT NULL,
+                    content TEXT,
+                    content_hash TEXT,
+                    created_at REAL,
+                    updated_at REAL,
+                    UNIQUE (topic_key, layout, params)
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS sections (
+                    id INTEGER PRIMARY KEY,
+                    report_id INTEGER REFERENCES reports (id),
+                    position INTEGER,
+                    heading TEXT,
+                    content TEXT,
+                    content_hash TEXT,
+                    researched_at REAL
+                )"""
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sections_report ON sections (report_id, position)")
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS section_index USING fts5(topic, heading, content)")
+
+    def _load(self, row):
+        sections = [StoredSection(*section) for section in self._conn.execute(
+            "SELECT heading, content, researched_at FROM sections WHERE report_id = ? ORDER BY position",
+            (row[0],))]
+        return StoredReport(*row, sections)
+
+    def load(self, topic, layout="sequential", params=None):
+        """Return the stored report for a topic, layout and run parameters, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, topic, layout, params, content, content_hash, created_at, updated_at FROM reports "
+                "WHERE topic_key = ? AND layout = ? AND params = ?",
+                (normalize_query(topic), layout, params_key(params))).fetchone()
+            return self._load(row) if row else None
+
+    def get(self, report_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, topic, layout, params, content, content_hash, created_at, updated_at FROM reports "
+                "WHERE id = ?", (report_id,)).fetchone()
+            return self._load(row) if row else None
+
+    def fresh_sections(self, topic, layout="sequential", max_age=None, params=None):
+        """Map heading to content for stored sections researched within max_age seconds"""
+        report = self.load(topic, layout, params)
+        if report is None:
+            return {}
+        max_age = self.max_age if max_age is None else max_age
+        cutoff = time.time() - max_age
+        return {s.heading: s.content for s in report.sections if s.researched_at >= cutoff}
+
+    def save(self, topic, content, layout="sequential", sections=None, refreshed=None, params=None):
+        """Store a finished report and return its id
+
+        sections defaults to the report split at its level-two headings. Headings in
+        refreshed (all of them when None) are stamped as researched now; the others keep
+        the time they were last researched.
+        """
+        sections = split_sections(content) if sections is None else sections
+        topic_key, key = normalize_query(topic), params_key(params)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM reports WHERE topic_key = ? AND layout = ? AND params = ?",
+                                     (topic_key, layout, key)).fetchone()
+            researched = {}
+            if row is None:
+                report_id = self._conn.execute(
+                    "INSERT INTO reports (topic, topic_key, layout, params, content, content_hash, created_at, "
+                    "updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (topic, topic_key, layout, key, content, content_hash(content), now, now)).lastrowid
+            else:
+                report_id = row[0]
+                researched = dict(self._conn.execute(
+                    "SELECT heading, researched_at FROM sections WHERE report_id = ?", (report_id,)).fetchall())
+                self._conn.execute(
+                    "UPDATE reports SET topic = ?, content = ?, content_hash = ?, updated_at = ? WHERE id = ?",
+                    (topic, content, content_hash(content), now, report_id))
+                self._conn.execute(
+                    "DELETE FROM section_index WHERE rowid IN (SELECT id FROM sections WHERE report_id = ?)",
+                    (report_id,))
+                self._conn.execute("DELETE FROM sections WHERE report_id = ?", (report_id,))
+            for position, (heading, text) in enumerate(sections):
+                stamp = now if refreshed is None or heading in refreshed else researched.get(heading, now)
+                section_id = self._conn.execute(
+                    "INSERT INTO sections (report_id, position, heading, content, content_hash, researched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (report_id, position, heading, text, content_hash(text), stamp)).lastrowid
+                body = text.split("\n", 1)[-1] if heading else text
+                self._conn.execute("INSERT INTO section_index (rowid, topic, heading, content) VALUES (?, ?, ?, ?)",
+                                   (section_id, topic, heading, body))
+        return report_id
+
+    def search(self, query, limit=10):
+        """Best matching sections across all stored reports, ranked by BM25"""
+        if not query.strip():
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.id, r.topic, s.heading, snippet(section_index, 2, '**', '**', ' … ', 16), r.updated_at "
+                "FROM section_index JOIN sections s ON s.id = section_index.rowid "
+                "JOIN reports r ON r.id = s.report_id "
+                "WHERE section_index MATCH ? ORDER BY bm25(section_index) LIMIT ?",
+                (_match_query(query), limit)).fetchall()
+        return [dict(zip(("report_id", "topic", "heading", "snippet", "updated_at"), row)) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            (reports,) = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()
+            (sections,) = self._conn.execute("SELECT COUNT(*) FROM sections").fetchone()
+        return {"reports": reports, "sections": sections}
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_report_store():
+    """Return the process-wide report store"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = ReportStore()
+        return _shared_store
@@ -0,0 +1,150 @@
+"""Streamlit-free entry points to the three-agent research pipeline.
+
+app.py, server.py, batch.py and research_agents.py all generate reports through
+generate_report here, so every front end runs the same agents, caches, context
+budgets and checkpoints. Run as a script it is a non-interactive CLI:
+
+    python research.py "Solid-state battery manufacturing" --parallel --out report.md
+    python research.py "Solid-state battery manufacturing" --run-id 3f2a9c01b7de   # resume
+
+Progress goes to stderr and the report to stdout unless --out is given. API keys
+come from the environment (or a .env file).
+"""
+import argparse
+import contextlib
+import html
+import json
+import os
+import re
+import sys
+
+from agent_pool import ResearchConfig, get_agent_pool
+from checkpoints import Checkpoints, new_run_id
+from citations import citation_queries, get_citation_service
+from compaction import context_budget
+from pipeline import run_report_pipeline
+from report_store import get_report_store
+from streaming import ProgressStream
+from telemetry import current_span, start_trace, trace_span
+
+DEFAULT_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+_TAG = re.compile(r"<[^>]+>")
+
+
+class QuietStatus:
+    """Status placeholder for callers that only want the finished report"""
+
+    def markdown(self, body, unsafe_allow_html=False):
+        pass
+
+
+def generate_report(topic, status_placeholder, config, parallel=False, max_concurrency=3, include_citations=False,
+                    research_depth=3, run_id=None, refresh=False):
+    """Generate a research report on the given topic, resuming run_id from its last completed task
+
+    A recent stored report written with the same settings is reused unless refresh is set.
+    config is the ResearchConfig of the caller; its keys go to this run's agents only
+    and are never written to os.environ, which is shared by every session in the process.
+    """
+    checkpoints = Checkpoints(run_id, scope={"topic": topic, "model": config.model, "parallel": parallel,
+                                             "citations": include_citations, "depth": research_depth})
+    with start_trace("generate_report", topic=topic, model=config.model, parallel=parallel,
+                     research_depth=research_depth, run_id=checkpoints.run_id) as tracer:
+        citations = None
+        if include_citations:
+            status_placeholder.markdown('<p class="status progress">Fetching citations...</p>', unsafe_allow_html=True)
+            try:
+                with trace_span("citations", "stage"):
+                    citations = get_citation_service().fetch_many(citation_queries(topic))
+            except Exception as e:
+                status_placeholder.markdown(f'<p class="status progress">Continuing without citations: {html.escape(str(e))}</p>', unsafe_allow_html=True)
+
+        pool = get_agent_pool()
+        with pool.agents(config) as agents:
+            current_span().set(agent_setup_ms=pool.last_setup_seconds * 1000)
+            report_content = run_report_pipeline(topic, status_placeholder, agents, parallel, max_concurrency, citations,
+                                                 store=get_report_store(), budget=context_budget(research_depth),
+                                                 checkpoints=checkpoints, refresh=refresh)
+        current_span().set(resumed_tasks=len(checkpoints.resumed))
+
+    if isinstance(status_placeholder, ProgressStream):
+        status_placeholder.emit("trace", tracer.to_dicts())
+    return report_content
+
+
+def run_research(topic, model=DEFAULT_MODEL, run_id=None, **options):
+    """Research a topic with keys from the environment and return the report text
+
+    options are the keyword arguments of generate_report. Passing the run_id of an
+    earlier attempt resumes it from its last completed task.
+    """
+    return generate_report(topic, QuietStatus(), ResearchConfig(model), run_id=run_id, **options)
+
+
+def run_job(topic, progress, model=DEFAULT_MODEL, parallel=False, max_concurrency=3, include_citations=False,
+            research_depth=3, run_id=None, refresh=False):
+    """Job queue runner for headless servers, with keys from the environment"""
+    return generate_report(topic, progress, ResearchConfig(model), parallel=parallel,
+                           max_concurrency=max_concurrency, include_citations=include_citations,
+                           research_depth=research_depth, run_id=run_id, refresh=refresh)
+
+
+def plain_text(body):
+    """Strip the HTML a status message carries for the Streamlit page"""
+    return html.unescape(_TAG.sub("", body)).strip()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a research report without the Streamlit UI")
+    parser.add_argument("topic", help="research topic, or - to read it from stdin")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--parallel", action="store_true", help="research subtopics concurrently")
+    parser.add_argument("--max-concurrency", type=int, default=3)
+    parser.add_argument("--citations", action="store_true", help="fetch scholarly citations")
+    parser.add_argument("--depth", type=int, default=3, choices=range(1, 6), help="research depth, 1 to 5")
+    parser.add_argument("--run-id", help="resume an earlier run from its last completed task")
+    parser.add_argument("--refresh", action="store_true", help="research again instead of reusing a stored report")
+    parser.add_argument("--out", help="write the report here instead of stdout")
+    parser.add_argument("--quiet", action="store_true", help="do not print progress to stderr")
+    parser.add_argument("--json", action="store_true", help="print the run id and report as one JSON object")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    topic = sys.stdin.read().strip() if args.topic == "-" else args.topic
+    run_id = args.run_id or new_run_id()
+    progress = ProgressStream()
+    # CrewAI logs agent activity to stdout, which is reserved for the report
+    log = open(os.devnull, "w") if args.quiet else contextlib.nullcontext(sys.stderr)
+    with log as out, contextlib.redirect_stdout(out):
+        progress.run(generate_report, topic, progress, ResearchConfig(args.model), parallel=args.parallel,
+                     max_concurrency=args.max_concurrency, include_citations=args.citations,
+                     research_depth=args.depth, run_id=run_id, refresh=args.refresh)
+        for event in progress.events():
+            if args.quiet:
+                continue
+            if event.kind == "status":
+                print(plain_text(event.content), file=sys.stderr)
+            elif event.kind == "step":
+                print(f"  {event.agent}: {event.content}", file=sys.stderr)
+            elif event.kind == "section":
+                print(f"  Finished section: {event.agent}", file=sys.stderr)
+
+    if progress.error is not None:
+        print(f"Research failed: {type(progress.error).__name__}: {progress.error}", file=sys.stderr)
+        print(f"Resume with: --run-id {run_id}", file=sys.stderr)
+        return 1
+    output = json.dumps({"run_id": run_id, "topic": topic, "report": progress.result}) if args.json else progress.result
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Report written to {args.out}", file=sys.stderr)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
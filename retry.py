@@ -0,0 +1,84 @@
+import contextvars
+import random
+import re
+import time
+from contextlib import contextmanager
+
+_cancel_event = contextvars.ContextVar("cancel_event", default=None)
+
+
+class Cancelled(RuntimeError):
+    """The run making a call was abandoned, so the call was not made"""
+
+
+@contextmanager
+def cancel_scope(event):
+    """Refuse provider calls made inside the block once event (a threading.Event) is set"""
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def raise_if_cancelled():
+    """Raise Cancelled if the enclosing cancel_scope has been cancelled"""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise Cancelled("Run was cancelled")
+
+
+def is_rate_limit_error(exc):
+    """Return True for provider rate-limit and overload errors worth retrying"""
+    name = type(exc).__name__.lower()
+    message = str(exc).lower()
+    return (
+        "ratelimit" in name
+        or "rate limit" in message
+        or "rate_limit" in message
+        or "429" in message
+        or "overloaded" in message
+    )
+
+
+def is_transient_error(exc):
+    """Return True for rate limits, timeouts, dropped connections and provider 5xx errors"""
+    if is_rate_limit_error(exc) or isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = type(exc).__name__.lower()
+    message = str(exc).lower()
+    return (
+        "timeout" in name
+        or "connection" in name
+        or "serviceunavailable" in name
+        or "internalserver" in name
+        or "timed out" in message
+        or re.search(r"\b50[0234]\b", message) is not None
+    )
+
+
+def backoff_delay(attempt, base_delay=2.0, max_delay=60.0, jitter=0.5):
+    """Exponential backoff with multiplicative jitter for the given zero-based attempt"""
+    delay = min(max_delay, base_delay * (2 ** attempt))
+    return delay * (1 + random.uniform(-jitter, jitter))
+
+
+def call_with_retries(fn, retries=3, base_delay=2.0, max_delay=60.0, jitter=0.5,
+                      retry_on=is_rate_limit_error, on_retry=None, sleep=time.sleep):
+    """Call fn(), retrying with jittered exponential backoff while retry_on(exc) holds
+
+    Every attempt raises Cancelled instead once the enclosing cancel_scope is cancelled.
+    """
+    attempt = 0
+    while True:
+        raise_if_cancelled()
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= retries or not retry_on(exc):
+                raise
+            delay = backoff_delay(attempt, base_delay, max_delay, jitter)
+            if on_retry is not None:
+                on_retry(attempt + 1, exc, delay)
+            sleep(delay)
+            attempt += 1
@@ -0,0 +1,213 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Optional
+
+DEFAULT_CACHE_DIR = os.getenv("RESEARCH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "research-agent"))
+DEFAULT_TTL = float(os.getenv("SEARCH_CACHE_TTL", 7 * 24 * 3600))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 10000))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", 20))
+
+
+def normalize_query(query):
+    """Normalize a search query so trivially different spellings share a cache entry"""
+    return re.sub(r"\s+", " ", str(query or "")).strip().lower()
+
+
+def cache_key(query, **params):
+    """Content address for a query and its search parameters"""
+    payload = json.dumps({"q": normalize_query(query), "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """SQLite-backed key/value cache for search results with TTL and LRU eviction"""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES, table="search_results"):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "search_cache.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            if self.path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"""CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    query TEXT,
+                    value TEXT,
+                    created_at REAL,
+                    accessed_at REAL
+                )"""
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)")
+
+    def get(self, query, **params):
+        """Return the cached result for a query, or None on a miss"""
+        key = cache_key(query, **params)
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                if row is not None:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, query, value, **params):
+        """Store a result and evict the least recently used entries over the size bound"""
+        key = cache_key(query, **params)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, query, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, normalize_query(query), json.dumps(value, default=str), now, now),
+            )
+            if self.max_entries:
+                (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+                if count > self.max_entries:
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE key IN "
+                        f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+
+    def fetch(self, query, backend: Callable[..., Any], **params):
+        """Return a cached result, calling backend(query, **params) on a miss"""
+        cached = self.get(query, **params)
+        if cached is not None:
+            return cached
+        result = backend(query, **params)
+        if result is not None:
+            self.set(query, result, **params)
+        return result
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+_shared_cache: Optional[SearchCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Return the process-wide search cache shared by every agent"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SearchCache()
+        return _shared_cache
+
+
+@functools.lru_cache(maxsize=None)
+def http_session(pool_size=HTTP_POOL_SIZE):
+    """Process-wide requests session so search calls reuse keep-alive connections"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_serper_class():
+    from crewai_tools import SerperDevTool
+    from compaction import dedupe_search_results
+    from retry import raise_if_cancelled
+    from telemetry import trace_span
+
+    class CachedSerperDevTool(SerperDevTool):
+        search_cache: Any = None
+        backend: Any = None
+        api_key: Optional[str] = None
+        page_fetcher: Any = None
+        fetch_pages: int = 0
+
+        def _search_params(self, kwargs):
+            params = {k: v for k, v in kwargs.items() if k not in ("search_query", "query")}
+            for name in ("search_type", "n_results", "country", "location", "locale"):
+                if hasattr(self, name):
+                    params.setdefault(name, getattr(self, name))
+            return params
+
+        def _run(self, **kwargs):
+            query = kwargs.get("search_query") or kwargs.get("query")
+            params = self._search_params(kwargs)
+            cache = self.search_cache or get_search_cache()
+            search = self.backend or (lambda q, **_: super(CachedSerperDevTool, self)._run(**kwargs))
+            called = []
+
+            def backend(q, **backend_params):
+                raise_if_cancelled()
+                called.append(True)
+                return search(q, **backend_params)
+
+            with trace_span("serper", "tool", query=query) as span:
+                result = cache.fetch(query, backend, **params)
+                if span is not None:
+                    span.set(cache_hit=not called)
+            result = dedupe_search_results(result)
+            if self.page_fetcher is not None and self.fetch_pages:
+                from page_fetch import attach_pages
+
+                result = attach_pages(result, self.page_fetcher, self.fetch_pages)
+            return result
+
+        def _make_api_request(self, search_query, search_type):
+            headers = {"X-API-KEY": self.api_key or os.environ["SERPER_API_KEY"], "content-type": "application/json"}
+            response = http_session().post(self._get_search_url(search_type), headers=headers,
+                                           json={"q": search_query, "num": self.n_results}, timeout=10)
+            response.raise_for_status()
+            results = response.json()
+            if not results:
+                raise ValueError("Empty response from Serper API")
+            return results
+
+    return CachedSerperDevTool
+
+
+def cached_search_tool(cache=None, backend=None, **kwargs):
+    """Return a SerperDevTool whose results are served from the shared search cache
+
+    Unless a backend or page_fetcher is given, the text of the top SEARCH_FETCH_PAGES
+    result pages is fetched and attached to each response.
+    """
+    if backend is None and "page_fetcher" not in kwargs:
+        from page_fetch import PAGE_FETCH_RESULTS, get_page_fetcher
+
+        if PAGE_FETCH_RESULTS:
+            kwargs.update(page_fetcher=get_page_fetcher(), fetch_pages=PAGE_FETCH_RESULTS)
+    return _cached_serper_class()(search_cache=cache, backend=backend, **kwargs)
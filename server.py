@@ -0,0 +1,182 @@
+"""HTTP API for research runs, for backend services that do not need the Streamlit UI.
+
+    uvicorn server:app --host 0.0.0.0 --port 8000
+    python server.py --port 8000
+
+Runs go through the same JobQueue as the app. Identical runs in flight are shared,
+new runs are admitted per user (the client address, or the X-User header when
+RESEARCH_TRUSTED_PROXY is set), and failed runs can be resumed. API keys come from the environment (or a .env file).
+
+    POST /research                  {"topic": ..., "parallel": true, "stream": false}
+    GET  /research/{job_id}         status, and the report once done
+    GET  /research/{job_id}/events  server-sent progress events from the start of the run
+    GET  /research/{job_id}/report  the finished report as markdown
+    POST /research/{job_id}/resume  rerun a failed job from its last completed task
+    GET  /health                    job and admission counts
+"""
+import argparse
+import asyncio
+import json
+import math
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from admission import BATCH, INTERACTIVE, TRUSTED_PROXY, AdmissionRejected
+from jobs import ACTIVE, DONE, FAILED, get_job_queue, to_json
+from research import DEFAULT_MODEL, run_job
+
+load_dotenv()
+
+STREAM_POLL_SECONDS = 0.1
+JOB_POLL_SECONDS = 1.0
+PRIORITIES = {"interactive": INTERACTIVE, "batch": BATCH}
+
+
+class ResearchRequest(BaseModel):
+    topic: str = Field(min_length=1)
+    model: str = DEFAULT_MODEL
+    parallel: bool = False
+    max_concurrency: int = Field(3, ge=1, le=8)
+    include_citations: bool = False
+    research_depth: int = Field(3, ge=1, le=5)
+    refresh: bool = Field(False, description="research again instead of reusing a stored report")
+    priority: Literal["interactive", "batch"] = "interactive"
+    stream: bool = Field(False, description="answer with the run's progress events instead of its job id")
+
+
+def job_queue():
+    return get_job_queue(run_job)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    job_queue()  # requeue jobs interrupted by the last shutdown
+    yield
+
+
+app = FastAPI(title="Research Assistant API", lifespan=lifespan)
+
+
+def _sse(kind, data):
+    return f"event: {kind}\ndata: {json.dumps(data, default=to_json)}\n\n"
+
+
+def _job_view(job):
+    fields = ("id", "topic", "status", "params", "priority", "error", "result", "created_at", "started_at",
+              "finished_at")
+    return {name: job[name] for name in fields}
+
+
+async def job_events(job_id):
+    """Server-sent events for a job: its progress so far, new events as they arrive, then done
+
+    Jobs started by this process stream every event; others are polled until they
+    finish and only the final event is sent.
+    """
+    queue = job_queue()
+    progress = queue.progress(job_id)
+    cursor = 0
+    while progress is not None:
+        events = progress.since(cursor)
+        cursor += len(events)
+        for event in events:
+            if event.kind == "done":
+                error = progress.error
+                yield _sse("done", {"status": FAILED if error else DONE, "result": progress.result,
+                                    "error": f"{type(error).__name__}: {error}" if error else None})
+                return
+            yield _sse(event.kind, {"agent": event.agent, "content": event.content})
+        await asyncio.sleep(STREAM_POLL_SECONDS)
+    job = queue.get(job_id)
+    while job["status"] in ACTIVE:
+        await asyncio.sleep(JOB_POLL_SECONDS)
+        job = queue.get(job_id)
+    yield _sse("done", {"status": job["status"], "result": job["result"], "error": job["error"]})
+
+
+def request_user(request, x_user=None):
+    """The user a request is admitted as
+
+    X-User and the forwarded client address are only honoured behind a trusted proxy,
+    which sets them for the caller; otherwise any client could spread its runs over
+    made-up users, so the peer address is used.
+    """
+    if TRUSTED_PROXY:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if x_user or forwarded:
+            return x_user or forwarded.split(",")[0].strip()
+    return request.client.host if request.client else ""
+
+
+def _get_job(job_id):
+    job = job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(404, f"Unknown research job {job_id}")
+    return job
+
+
+@app.post("/research", status_code=202)
+def submit_research(body: ResearchRequest, request: Request, x_user: Optional[str] = Header(None)):
+    try:
+        job_id = job_queue().submit(body.topic, user=request_user(request, x_user), priority=PRIORITIES[body.priority], model=body.model,
+                                    parallel=body.parallel, max_concurrency=body.max_concurrency,
+                                    include_citations=body.include_citations, research_depth=body.research_depth,
+                                    refresh=body.refresh)
+    except AdmissionRejected as exc:
+        headers = {"Retry-After": str(math.ceil(exc.retry_after))} if exc.retry_after else None
+        raise HTTPException(429, str(exc), headers=headers)
+    if body.stream:
+        return StreamingResponse(job_events(job_id), media_type="text/event-stream", headers={"X-Job-Id": job_id})
+    return _job_view(_get_job(job_id))
+
+
+@app.get("/research/{job_id}")
+def get_research(job_id: str):
+    return _job_view(_get_job(job_id))
+
+
+@app.get("/research/{job_id}/events")
+def research_events(job_id: str):
+    _get_job(job_id)
+    return StreamingResponse(job_events(job_id), media_type="text/event-stream")
+
+
+@app.get("/research/{job_id}/report", response_class=PlainTextResponse)
+def research_report(job_id: str):
+    job = _get_job(job_id)
+    if job["status"] != DONE:
+        raise HTTPException(409, f"Research job {job_id} is {job['status']}")
+    return PlainTextResponse(job["result"], media_type="text/markdown")
+
+
+@app.post("/research/{job_id}/resume", status_code=202)
+def resume_research(job_id: str):
+    _get_job(job_id)
+    if not job_queue().resume(job_id):
+        raise HTTPException(409, f"Research job {job_id} has not failed")
+    return _job_view(_get_job(job_id))
+
+
+@app.get("/health")
+def health():
+    queue = job_queue()
+    return {"status": "ok", "jobs": queue.stats(), "admission": queue.admission.stats()}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
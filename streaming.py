@@ -0,0 +1,124 @@
+import contextvars
+import queue
+import re
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+ProgressEvent = namedtuple("ProgressEvent", ["kind", "agent", "content"])
+
+_token_sink = contextvars.ContextVar("token_sink", default=None)
+_current_agent = contextvars.ContextVar("current_agent", default="")
+
+
+def current_token_sink():
+    """Return the ProgressStream receiving LLM tokens in this context, if any"""
+    return _token_sink.get()
+
+
+@contextmanager
+def agent_context(agent):
+    """Attribute the LLM calls and tokens made inside the block to the named agent"""
+    token = _current_agent.set(agent)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+def describe_step(step):
+    """Summarize a CrewAI agent step (action, finish or tool result) in one line"""
+    tool = getattr(step, "tool", None)
+    if tool:
+        return f"Using {tool}: {str(getattr(step, 'tool_input', ''))[:120]}"
+    if hasattr(step, "output"):
+        return "Finished its answer"
+    if hasattr(step, "result"):
+        return "Received tool result"
+    return str(getattr(step, "text", step))[:120]
+
+
+class ProgressStream:
+    """Thread-safe queue of progress events produced by a crew running off the script thread
+
+    It also accepts the markdown() call of a Streamlit placeholder, so code written against
+    a status placeholder can report status from a worker thread.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.result = None
+        self.error = None
+
+    def emit(self, kind, content="", agent=""):
+        self.queue.put(ProgressEvent(kind, agent, content))
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.emit("status", body)
+
+    def step_callback(self, agent):
+        """Return a step callback that reports steps of the given agent"""
+        return lambda step: self.emit("step", describe_step(step), agent)
+
+    def task_callback(self, output):
+        self.emit("task", output.raw, output.agent)
+
+    def section_callback(self, index, title, content):
+        self.emit("section", content, title)
+
+    def llm_start(self):
+        self.emit("llm_start", agent=_current_agent.get())
+
+    def token(self, text):
+        self.emit("token", text, _current_agent.get())
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn in the current thread with this stream receiving its LLM tokens"""
+        token = _token_sink.set(self)
+        try:
+            self.result = fn(*args, **kwargs)
+        except Exception as exc:
+            self.error = exc
+        finally:
+            _token_sink.reset(token)
+            self.emit("done")
+        return self.result
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn in a background thread with this stream receiving its LLM tokens"""
+        worker = threading.Thread(target=self.call, args=(fn, *args), kwargs=kwargs, daemon=True)
+        worker.start()
+        return worker
+
+    def events(self, poll_interval=0.1):
+        """Yield events until the background run finishes"""
+        while True:
+            try:
+                event = self.queue.get(timeout=poll_interval)
+            except queue.Empty:
+                continue
+            if event.kind == "done":
+                return
+            yield event
+
+
+class FinalAnswerBuffer:
+    """Accumulate streamed tokens and expose the text after the last "Final Answer:" marker"""
+
+    marker = re.compile(r"Final Answer:\s*")
+
+    def __init__(self):
+        self.text = ""
+
+    def reset(self):
+        self.text = ""
+
+    def feed(self, token):
+        self.text += token
+
+    @property
+    def answer(self):
+        end = None
+        for match in self.marker.finditer(self.text):
+            end = match.end()
+        return self.text[end:] if end is not None else ""
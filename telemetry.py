@@ -0,0 +1,209 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from search_cache import DEFAULT_CACHE_DIR
+
+TRACE_DIR = os.getenv("RESEARCH_TRACE_DIR", os.path.join(DEFAULT_CACHE_DIR, "traces"))
+TRACE_EXPORT = os.getenv("RESEARCH_TRACE", "1") != "0"
+TRACE_MAX_FILES = int(os.getenv("RESEARCH_TRACE_MAX_FILES", 500))
+TRACE_MAX_AGE = float(os.getenv("RESEARCH_TRACE_MAX_AGE", 7 * 24 * 3600))
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed unit of work (stage, agent step, LLM or tool call) within a trace"""
+
+    def __init__(self, tracer, name, kind, parent_id=None, attributes=None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.end = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key, amount=1):
+        """Increment a numeric attribute such as a token count or retry counter"""
+        self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def to_dict(self):
+        """OpenTelemetry-style span record"""
+        end = self.end if self.end is not None else time.time()
+        return {
+            "trace_id": self.tracer.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": int(self.start * 1e9),
+            "end_time_unix_nano": int(end * 1e9),
+            "duration_ms": (end - self.start) * 1000,
+            "attributes": self.attributes,
+        }
+
+
+class Tracer:
+    """Collects the spans of one traced run, safe to use from worker threads"""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, kind="internal", parent=None, **attributes):
+        parent = parent or _current_span.get()
+        span = Span(self, name, kind, parent.span_id if parent else None, attributes)
+        with self._lock:
+            self.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as exc:
+            span.set(error=f"{type(exc).__name__}: {exc}"[:300])
+            raise
+        finally:
+            span.end = time.time()
+            _current_span.reset(token)
+
+    def to_dicts(self):
+        with self._lock:
+            return [span.to_dict() for span in self.spans]
+
+    def export_jsonl(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            for record in self.to_dicts():
+                f.write(json.dumps(record, default=str) + "\n")
+        return path
+
+
+def current_span():
+    """Return the innermost active span in this context, if a trace is running"""
+    return _current_span.get()
+
+
+def prune_traces(trace_dir=TRACE_DIR, max_files=TRACE_MAX_FILES, max_age=TRACE_MAX_AGE):
+    """Delete trace files older than max_age seconds, then the oldest beyond max_files"""
+    try:
+        entries = [entry for entry in os.scandir(trace_dir) if entry.name.endswith(".jsonl") and entry.is_file()]
+    except FileNotFoundError:
+        return 0
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    cutoff = time.time() - max_age
+    removed = 0
+    for index, entry in enumerate(entries):
+        if index >= max_files or entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+@contextmanager
+def start_trace(name, export=TRACE_EXPORT, trace_dir=TRACE_DIR, **attributes):
+    """Trace a run under a root span and write it to <trace_dir>/<trace_id>.jsonl when done
+
+    Exporting also prunes old trace files, so the directory does not grow without bound.
+    """
+    tracer = Tracer()
+    try:
+        with tracer.span(name, "root", parent=None, **attributes):
+            yield tracer
+    finally:
+        if export:
+            tracer.export_jsonl(os.path.join(trace_dir, f"{tracer.trace_id}.jsonl"))
+            prune_traces(trace_dir)
+
+
+@contextmanager
+def trace_span(name, kind="internal", **attributes):
+    """Record a child of the active span; a no-op yielding None outside a trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    with parent.tracer.span(name, kind, **attributes) as span:
+        yield span
+
+
+def record(key, amount=1):
+    """Add to a counter on the active span, if any"""
+    span = _current_span.get()
+    if span is not None:
+        span.add(key, amount)
+
+
+def step_span_callback(agent):
+    """Step callback recording each agent step as a span since the agent's previous step
+
+    CrewAI reports steps only once they finish, so a step's start is the end of the
+    previous step of the same agent, or the start of the enclosing span.
+    """
+    last_end = [0.0]
+
+    def callback(step):
+        parent = _current_span.get()
+        if parent is None:
+            return
+        from streaming import describe_step
+
+        span = Span(parent.tracer, agent, "agent_step", parent.span_id, {"step": describe_step(step)})
+        span.start = max(last_end[0], parent.start)
+        span.end = last_end[0] = time.time()
+        with parent.tracer._lock:
+            parent.tracer.spans.append(span)
+
+    return callback
+
+
+def llm_usage(model, messages, completion):
+    """Token counts and estimated USD cost of one completion, as span attributes"""
+    try:
+        import litellm
+
+        prompt_tokens = litellm.token_counter(model=model, messages=messages)
+        completion_tokens = litellm.token_counter(model=model, text=completion or "")
+    except Exception:
+        return {}
+    usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+    try:
+        usage["cost_usd"] = sum(litellm.cost_per_token(
+            model=model, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens))
+    except Exception:
+        pass
+    return usage
+
+
+def summarize_trace(spans):
+    """Aggregate totals for a list of span dicts: wall time, tokens, cost, cache hits and retries"""
+    root = next((s for s in spans if s["parent_span_id"] is None), None)
+    llm = [s for s in spans if s["kind"] == "llm"]
+    tools = [s for s in spans if s["kind"] == "tool"]
+
+    def total(items, key):
+        return sum(s["attributes"].get(key, 0) or 0 for s in items)
+
+    return {
+        "wall_seconds": root["duration_ms"] / 1000 if root else 0.0,
+        "llm_calls": len(llm),
+        "llm_cache_hits": sum(1 for s in llm if s["attributes"].get("cache_hit")),
+        "prompt_tokens": total(llm, "prompt_tokens"),
+        "completion_tokens": total(llm, "completion_tokens"),
+        "cost_usd": total(llm, "cost_usd"),
+        "tool_calls": len(tools),
+        "tool_cache_hits": sum(1 for s in tools if s["attributes"].get("cache_hit")),
+        "retries": total(spans, "retries"),
+    }
@@ -0,0 +1,41 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class Passthrough:
+    """Stands in for the LLM and search caches so every call reaches the replayed backend"""
+
+    def complete(self, messages, call, namespace=""):
+        return call()
+
+    def fetch(self, query, backend, **params):
+        return backend(query, **params)
+
+
+class Quiet:
+    def markdown(self, body, unsafe_allow_html=False):
+        pass
+
+
+@pytest.fixture
+def replay_agents():
+    """Research, visualization and writing agents answered by a replayed model and search engine"""
+    from crew_factory import setup_agents
+    from llm_cache import cached_llm
+    from replay import Cassette, ReplayLLM, ReplaySearch
+    from search_cache import cached_search_tool
+
+    cassette = Cassette()
+    llm = ReplayLLM(cassette)
+    agents = setup_agents("gpt-4o-mini", llm=cached_llm("gpt-4o-mini", cache=Passthrough(), fake=llm),
+                          search_tool=cached_search_tool(cache=Passthrough(), backend=ReplaySearch(cassette)))
+    for agent in agents:
+        agent.verbose = False
+    return agents, llm
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from admission import BATCH, INTERACTIVE, AdmissionController, AdmissionRejected
+from jobs import DONE, JobQueue
+from replay import Cassette, ReplayLLM
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_users_over_their_rate_are_rejected():
+    controller = AdmissionController(user_rate=1 / 3600, user_burst=2)
+    controller.check("ana")
+    controller.check("ana")
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check("ana")
+    assert rejected.value.retry_after > 0
+    controller.check("ben")
+    assert controller.stats()["rejected"] == 1
+
+
+def test_full_queue_rejects_new_runs():
+    controller = AdmissionController(max_active=1, max_queued=1)
+
+    def wait_for_slot():
+        with controller.slot():
+            pass
+
+    with controller.slot():
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        wait_for(lambda: controller.stats()["queued"] == 1)
+        with pytest.raises(AdmissionRejected):
+            controller.check("ana")
+    waiter.join(5)
+
+
+def test_slots_go_by_priority_then_arrival():
+    controller = AdmissionController(max_active=1)
+    order = []
+
+    def run(name, priority):
+        with controller.slot(priority):
+            order.append(name)
+
+    with controller.slot():
+        threads = []
+        for name, priority in (("batch", BATCH), ("first", INTERACTIVE), ("second", INTERACTIVE)):
+            threads.append(threading.Thread(target=run, args=(name, priority)))
+            threads[-1].start()
+            wait_for(lambda: controller.stats()["queued"] == len(threads))
+    for thread in threads:
+        thread.join(5)
+    assert order == ["first", "second", "batch"]
+    assert controller.stats()["peak_active"] == 1
+
+
+def test_job_queue_turns_away_users_over_their_rate(tmp_path):
+    llm = ReplayLLM(Cassette())
+    queue = JobQueue(lambda topic, progress, **params: llm.call(f"Write a report on {topic}."),
+                     path=str(tmp_path / "jobs.sqlite3"),
+                     admission=AdmissionController(user_rate=1 / 3600, user_burst=1))
+    job_id = queue.submit("Topic one", user="ana")
+    with pytest.raises(AdmissionRejected):
+        queue.submit("Topic two", user="ana")
+    assert queue.wait(job_id, timeout=5, poll_interval=0.01)["status"] == DONE
+    assert queue.stats()["done"] == 1 and llm.calls == 1
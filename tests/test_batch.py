@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+
+import pytest
+
+from batch import load_topics, process_topic, report_filename, run_batch, run_with_timeout
+from retry import Cancelled, call_with_retries
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class FlakyRunner:
+    """Batch runner that is rate limited on its first failures calls, then writes a stub report"""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.topics = []
+
+    def __call__(self, topic):
+        self.topics.append(topic)
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("429 rate limit exceeded")
+        return f"# Report on {topic}\n"
+
+
+def test_call_with_retries_backs_off_on_rate_limits():
+    runner = FlakyRunner(failures=2)
+    delays = []
+    report = call_with_retries(lambda: runner("batteries"), retries=3, base_delay=1.0, jitter=0,
+                               sleep=delays.append)
+    assert report == "# Report on batteries\n"
+    assert delays == [1.0, 2.0]
+
+
+def test_call_with_retries_gives_up():
+    runner = FlakyRunner(failures=5)
+    with pytest.raises(RateLimitError):
+        call_with_retries(lambda: runner("topic"), retries=2, sleep=lambda delay: None)
+    assert len(runner.topics) == 3
+
+
+def test_call_with_retries_does_not_retry_other_errors():
+    attempts = []
+
+    def fail():
+        attempts.append(1)
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        call_with_retries(fail, retries=3, sleep=lambda delay: None)
+    assert len(attempts) == 1
+
+
+def test_process_topic_retries_and_writes_report(tmp_path):
+    record = process_topic("Solid-state batteries", FlakyRunner(failures=2), str(tmp_path), retries=3,
+                           base_delay=0.001)
+    assert record["status"] == "ok"
+    assert record["attempts"] == 3
+    assert record["output"] == str(tmp_path / report_filename("Solid-state batteries"))
+    assert (tmp_path / report_filename("Solid-state batteries")).read_text() == "# Report on Solid-state batteries\n"
+
+
+def test_topics_with_the_same_slug_get_separate_reports(tmp_path):
+    topics = ["AI safety", "AI-safety", "ai safety"]
+    assert report_filename("AI safety").startswith("ai-safety-")
+    summary = run_batch(topics, FlakyRunner(), str(tmp_path), workers=2)
+    assert summary["succeeded"] == 3
+    reports = sorted(path.read_text() for path in tmp_path.glob("*.md"))
+    assert reports == sorted(f"# Report on {topic}\n" for topic in topics)
+
+
+def test_run_with_timeout():
+    assert run_with_timeout(lambda: "done", 1) == "done"
+    with pytest.raises(TimeoutError):
+        run_with_timeout(lambda: time.sleep(0.5), 0.05)
+    with pytest.raises(ValueError):
+        run_with_timeout(lambda: int("x"), 1)
+
+
+def test_timed_out_run_is_cancelled():
+    runner = FlakyRunner()
+    finished = threading.Event()
+    outcome = []
+
+    def slow():
+        time.sleep(0.2)
+        try:
+            call_with_retries(lambda: runner("topic"))
+        except Cancelled as exc:
+            outcome.append(exc)
+        finished.set()
+
+    with pytest.raises(TimeoutError):
+        run_with_timeout(slow, 0.05)
+    assert finished.wait(2)
+    assert outcome and runner.topics == []
+
+
+def test_timeouts_are_retried(tmp_path):
+    attempts = []
+
+    def runner(topic):
+        attempts.append(topic)
+        if len(attempts) == 1:
+            time.sleep(0.5)
+        return "report"
+
+    record = process_topic("topic", runner, str(tmp_path), timeout=0.1, retries=1, base_delay=0.001)
+    assert record["status"] == "ok"
+    assert record["attempts"] == 2
+
+
+def test_run_batch_resumes_from_checkpoint(tmp_path):
+    runner = FlakyRunner()
+    first = run_batch(["a", "b"], runner, str(tmp_path), workers=2)
+    assert first["succeeded"] == 2
+    second = run_batch(["a", "b", "c"], runner, str(tmp_path), workers=2)
+    assert second["skipped"] == 2 and second["succeeded"] == 1
+    assert sorted(runner.topics) == ["a", "b", "c"]
+
+
+def test_load_topics_reads_every_format(tmp_path):
+    (tmp_path / "topics.jsonl").write_text(json.dumps({"topic": "a"}) + "\n\n" + json.dumps("b") + "\n")
+    (tmp_path / "topics.csv").write_text("topic,notes\na,x\nb,y\n")
+    (tmp_path / "topics.txt").write_text("a\n\nb\n")
+    for name in ("topics.jsonl", "topics.csv", "topics.txt"):
+        assert load_topics(str(tmp_path / name)) == ["a", "b"]
@@ -0,0 +1,60 @@
+import pytest
+
+from checkpoints import Checkpoints
+from conftest import Quiet
+from llm_cache import messages_to_prompt
+from pipeline import run_report_pipeline
+from search_cache import SearchCache
+
+SCOPE = {"topic": "Quantum computing"}
+
+
+@pytest.fixture
+def checkpoint_cache():
+    return SearchCache(":memory:", table="task_checkpoints")
+
+
+@pytest.fixture
+def flaky_writer(replay_agents, monkeypatch):
+    """Replayed agents whose writer fails until fail is cleared"""
+    agents, llm = replay_agents
+    replay = llm.call
+    state = {"fail": True}
+
+    def call(messages, *args, **kwargs):
+        if state["fail"] and "Technical Writer" in messages_to_prompt(messages):
+            raise ValueError("writer broke")
+        return replay(messages, *args, **kwargs)
+
+    monkeypatch.setattr(llm, "call", call)
+    return agents, llm, state
+
+
+def test_saved_tasks_are_scoped_to_run_and_settings(checkpoint_cache):
+    scope = {"topic": "Quantum computing", "depth": 3}
+    Checkpoints("run1", cache=checkpoint_cache, scope=scope).save("research", "findings")
+    resumed = Checkpoints("run1", cache=checkpoint_cache, scope=dict(scope))
+    assert resumed.get("research") == "findings" and resumed.resumed == ["research"]
+    assert Checkpoints("run2", cache=checkpoint_cache, scope=scope).get("research") is None
+    assert Checkpoints("run1", cache=checkpoint_cache, scope={**scope, "topic": "Fusion"}).get("research") is None
+    assert Checkpoints("run1", cache=checkpoint_cache, scope={**scope, "depth": 5}).get("research") is None
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_failed_run_resumes_after_last_completed_task(flaky_writer, checkpoint_cache, parallel):
+    agents, llm, state = flaky_writer
+    with pytest.raises(ValueError, match="writer broke"):
+        run_report_pipeline("Quantum computing", Quiet(), agents, parallel=parallel, verbose=False,
+                            checkpoints=Checkpoints("run1", cache=checkpoint_cache, scope=SCOPE))
+    first_calls = llm.calls
+
+    state["fail"] = False
+    llm.calls = 0
+    checkpoints = Checkpoints("run1", cache=checkpoint_cache, scope=SCOPE)
+    report = run_report_pipeline("Quantum computing", Quiet(), agents, parallel=parallel, verbose=False,
+                                 checkpoints=checkpoints)
+    assert report
+    if parallel:
+        assert checkpoints.resumed and llm.calls < first_calls
+    else:
+        assert checkpoints.resumed == ["research"] and llm.calls == 1
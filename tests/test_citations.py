@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from citations import CitationService, citation_queries, dedupe_citations, format_citations
+from rate_limit import TokenBucket
+from search_cache import SearchCache
+
+
+class FakeScholar:
+    """Scholar backend that answers after latency, tracking calls and how many overlap"""
+
+    def __init__(self, latency=0.0, fail=False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query, limit):
+        with self._lock:
+            self.calls.append((query, time.monotonic()))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.latency)
+            if self.fail:
+                raise ConnectionError("scholar is unavailable")
+            shared = {"title": "A survey of the field", "author": ["Lee"], "year": "2023", "doi": "10.1/SURVEY"}
+            return [shared, {"title": f"Paper on {query}", "author": "Kim", "year": "2024", "doi": ""}][:limit]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def service(backend, rate=1000.0, capacity=10):
+    return CitationService(backend, cache=SearchCache(":memory:", table="citations"),
+                           rate_limiter=TokenBucket(rate, capacity=capacity))
+
+
+def test_lookups_are_rate_limited():
+    backend = FakeScholar()
+    citations = service(backend, rate=20, capacity=1)
+    for query in ("a", "b", "c", "d"):
+        citations.fetch(query)
+    times = [at for _, at in backend.calls]
+    assert times[-1] - times[0] >= 0.14
+
+
+def test_queries_fan_out_concurrently_and_merge():
+    backend = FakeScholar(latency=0.2)
+    start = time.monotonic()
+    merged = service(backend).fetch_many(citation_queries("fusion"))
+    assert time.monotonic() - start < 0.5
+    assert backend.peak == 3
+    assert [c["title"] for c in merged] == ["A survey of the field", "Paper on fusion", "Paper on fusion review",
+                                            "Paper on fusion recent advances"]
+
+
+def test_results_are_cached_per_query_and_limit():
+    backend = FakeScholar()
+    citations = service(backend)
+    first = citations.fetch("fusion")
+    assert citations.fetch("  Fusion ") == first
+    assert len(citations.fetch("fusion", limit=1)) == 1
+    assert [query for query, _ in backend.calls] == ["fusion", "fusion"]
+
+
+def test_backend_errors_propagate_and_are_not_cached():
+    cache = SearchCache(":memory:", table="citations")
+    failing = CitationService(FakeScholar(fail=True), cache=cache, rate_limiter=TokenBucket(1000, capacity=10))
+    with pytest.raises(ConnectionError):
+        failing.fetch_many(["fusion", "fusion review"])
+    assert cache.stats()["entries"] == 0
+    backend = FakeScholar()
+    assert CitationService(backend, cache=cache, rate_limiter=TokenBucket(1000, capacity=10)).fetch("fusion")
+    assert len(backend.calls) == 1
+
+
+def test_dedupe_prefers_doi_then_title():
+    citations = [{"title": "X", "doi": "10.1/A"}, {"title": "Other title", "doi": "10.1/a"},
+                 {"title": "Same  Title!"}, {"title": "same title"}]
+    assert dedupe_citations(citations) == [citations[0], citations[2]]
+    assert format_citations([{"title": "X", "author": ["Lee", "Kim"], "year": "2023", "url": "https://x"}]) == \
+        "1. Lee, Kim (2023). *X*. https://x"
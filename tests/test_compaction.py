@@ -0,0 +1,64 @@
+import json
+
+from compaction import (DEPTH_BUDGETS, compact, compact_context, context_budget, count_tokens, dedupe_search_results,
+                        dedupe_snippets, summarize)
+from findings import ResearchFindings, parse_findings
+
+PROSE = "\n".join(
+    f"Fusion startup {i} raised funding for superconducting magnets in {2015 + i}. "
+    f"Analysts say plant number {i} could deliver power by {2035 + i} if tritium supply holds."
+    for i in range(40))
+REPORT = "## Overview\n\n" + PROSE + "\n\n```mermaid\ngraph TD\n    A[Fusion] --> B[Magnets]\n```\n"
+
+
+def test_budgets_grow_with_depth_and_clamp():
+    budgets = [context_budget(depth) for depth in sorted(DEPTH_BUDGETS)]
+    assert all(a.visualization < b.visualization and a.writing < b.writing for a, b in zip(budgets, budgets[1:]))
+    assert context_budget(0) == DEPTH_BUDGETS[1] and context_budget("9") == DEPTH_BUDGETS[5]
+
+
+def test_near_duplicate_snippets_are_dropped():
+    snippets = ["Solid-state batteries could reach cars by 2027, analysts said on Monday.",
+                "Solid-state batteries could reach cars by 2027, analysts said on Tuesday.",
+                "Sodium-ion cells are cheaper but store less energy per kilogram."]
+    assert dedupe_snippets(snippets) == [snippets[0], snippets[2]]
+
+
+def test_search_results_drop_repeated_links_and_snippets():
+    results = {"organic": [
+        {"link": "https://a", "snippet": "Grid storage prices fell by a third over the last two years."},
+        {"link": "https://a", "snippet": "Something else entirely about hydrogen."},
+        {"link": "https://b", "snippet": "Grid storage prices fell by a third over the last two years!"},
+        {"link": "https://c", "snippet": "Pumped hydro still holds most installed storage capacity."},
+    ]}
+    assert [item["link"] for item in dedupe_search_results(results)["organic"]] == ["https://a", "https://c"]
+    assert dedupe_search_results("no results") == "no results"
+
+
+def test_summary_fits_budget_and_keeps_structure():
+    summary = summarize(REPORT, 200)
+    assert count_tokens(summary) <= 200
+    assert summary.startswith("## Overview")
+    assert "```mermaid\ngraph TD\n    A[Fusion] --> B[Magnets]\n```" in summary
+    repeated = summarize("Magnets are the main cost of a tokamak. " * 3 + "Funding doubled last year.", 500)
+    assert repeated == "Magnets are the main cost of a tokamak. Funding doubled last year."
+
+
+def test_findings_are_trimmed_as_json():
+    findings = ResearchFindings(topic="Fusion", summary="Magnets and funding.",
+                                key_players=[{"name": f"Company {i}", "description": "Builds compact tokamaks " * 5}
+                                             for i in range(40)],
+                                timeline=[{"date": str(2000 + i), "event": "Milestone"} for i in range(10)])
+    text = compact(findings.model_dump_json(), 300)
+    assert count_tokens(text) <= 300
+    trimmed = parse_findings(text)
+    assert trimmed.topic == "Fusion" and 0 < len(trimmed.key_players) < 40
+    assert json.loads(text)["timeline"]
+
+
+def test_context_budget_is_shared_between_outputs():
+    short = "## Findings\n\nA short note on magnets."
+    texts = compact_context([REPORT, short, REPORT], 600)
+    assert texts[1] == short
+    assert sum(count_tokens(text) for text in texts) <= 600
+    assert compact_context([short], 600) == [short]
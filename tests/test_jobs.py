@@ -0,0 +1,129 @@
+import json
+import sqlite3
+import threading
+import time
+
+from admission import BATCH, INTERACTIVE, AdmissionController
+from checkpoints import Checkpoints
+from jobs import DONE, FAILED, OWNER_TIMEOUT, RUNNING, JobQueue
+from replay import Cassette, ReplayLLM
+from search_cache import SearchCache, cache_key
+
+
+class Runner:
+    """Job runner that researches and writes through a replayed model, checkpointing the research"""
+
+    def __init__(self, fail_writing=0):
+        self.llm = ReplayLLM(Cassette())
+        self.checkpoints = SearchCache(":memory:", table="task_checkpoints")
+        self.fail_writing = fail_writing
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, topic, progress, run_id=None, **params):
+        self.release.wait(5)
+        progress.markdown("Researching")
+        checkpoints = Checkpoints(run_id, cache=self.checkpoints, scope={"topic": topic, **params})
+        research = checkpoints.get("research")
+        if research is None:
+            research = self.llm.call(f"Conduct comprehensive research on {topic}.")
+            checkpoints.save("research", research)
+        if self.fail_writing:
+            self.fail_writing -= 1
+            raise RuntimeError("writer failed")
+        return self.llm.call(f"Write a report on {topic}. Findings: {research}")
+
+
+def make_queue(tmp_path, runner, **admission):
+    return JobQueue(runner, path=str(tmp_path / "jobs.sqlite3"), admission=AdmissionController(**admission))
+
+
+def test_identical_jobs_in_flight_are_shared(tmp_path):
+    runner = Runner()
+    runner.release.clear()
+    queue = make_queue(tmp_path, runner, user_burst=3)
+    first = queue.submit("Quantum sensors", depth=3)
+    assert queue.submit("quantum  SENSORS", depth=3) == first
+    other = queue.submit("Quantum sensors", depth=4)
+    assert other != first
+    runner.release.set()
+    assert queue.wait(first, timeout=5, poll_interval=0.01)["status"] == DONE
+    assert queue.wait(other, timeout=5, poll_interval=0.01)["status"] == DONE
+    assert runner.llm.calls == 4
+    assert queue.submit("Quantum sensors", depth=3) != first
+
+
+def test_progress_is_replayed_to_every_viewer(tmp_path):
+    queue = make_queue(tmp_path, Runner())
+    job_id = queue.submit("Grid storage")
+    job = queue.wait(job_id, timeout=5, poll_interval=0.01)
+    assert job["status"] == DONE and "Final Answer:" in job["result"]
+    for _ in range(2):
+        assert [event.content for event in queue.progress(job_id).events()][-1] == "Researching"
+
+
+def test_failed_jobs_keep_their_error(tmp_path):
+    queue = make_queue(tmp_path, Runner(fail_writing=1))
+    job = queue.wait(queue.submit("Fusion"), timeout=5, poll_interval=0.01)
+    assert job["status"] == FAILED and job["error"] == "RuntimeError: writer failed"
+    assert queue.stats()[FAILED] == 1
+
+
+def test_resubmitted_failed_job_resumes_from_checkpoint(tmp_path):
+    runner = Runner(fail_writing=1)
+    queue = make_queue(tmp_path, runner)
+    job_id = queue.submit("Grid storage")
+    assert queue.wait(job_id, timeout=5, poll_interval=0.01)["status"] == FAILED
+    assert runner.llm.calls == 1
+
+    assert queue.submit("Grid storage") == job_id
+    job = queue.wait(job_id, timeout=5, poll_interval=0.01)
+    assert job["status"] == DONE and job["error"] is None
+    assert runner.llm.calls == 2
+    assert not queue.resume(job_id)
+
+
+def test_resubmitted_failed_job_takes_the_new_user_and_priority(tmp_path):
+    queue = make_queue(tmp_path, Runner(fail_writing=1))
+    job_id = queue.submit("Tidal power", user="ana", priority=BATCH)
+    assert queue.wait(job_id, timeout=5, poll_interval=0.01)["status"] == FAILED
+    assert queue.submit("Tidal power", user="ben", priority=INTERACTIVE) == job_id
+    job = queue.wait(job_id, timeout=5, poll_interval=0.01)
+    assert (job["status"], job["user"], job["priority"]) == (DONE, "ben", INTERACTIVE)
+
+
+def test_resume_requeues_only_failed_jobs(tmp_path):
+    queue = make_queue(tmp_path, Runner(fail_writing=1))
+    job_id = queue.submit("Fusion")
+    assert queue.wait(job_id, timeout=5, poll_interval=0.01)["status"] == FAILED
+    assert queue.resume(job_id)
+    assert queue.wait(job_id, timeout=5, poll_interval=0.01)["status"] == DONE
+    assert not queue.resume("unknown")
+
+
+def insert_running_job(tmp_path, job_id, owner, heartbeat):
+    """A row left running by the queue owner, whose last heartbeat was at heartbeat"""
+    with sqlite3.connect(tmp_path / "jobs.sqlite3") as conn:
+        conn.execute("INSERT OR REPLACE INTO owners (id, heartbeat) VALUES (?, ?)", (owner, heartbeat))
+        conn.execute("INSERT INTO jobs (id, key, topic, params, status, created_at, owner) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (job_id, cache_key(job_id), job_id, json.dumps({}), RUNNING, time.time(), owner))
+
+
+def test_jobs_of_dead_owners_are_recovered(tmp_path):
+    make_queue(tmp_path, Runner())
+    insert_running_job(tmp_path, "interrupted", "crashed", time.time() - OWNER_TIMEOUT - 1)
+    restarted = make_queue(tmp_path, Runner())
+    job = restarted.wait("interrupted", timeout=5, poll_interval=0.01)
+    assert job["status"] == DONE and job["owner"] == restarted.owner
+
+
+def test_jobs_of_live_owners_are_left_alone(tmp_path):
+    other = make_queue(tmp_path, Runner())
+    insert_running_job(tmp_path, "running-elsewhere", other.owner, time.time())
+    runner = Runner()
+    make_queue(tmp_path, runner)
+    time.sleep(0.1)
+    job = other.get("running-elsewhere")
+    assert job["status"] == RUNNING and job["owner"] == other.owner
+    assert runner.llm.calls == 0
@@ -0,0 +1,69 @@
+import httpx
+
+from page_fetch import PageFetcher, attach_pages, dedupe_documents, normalize_url
+from replay import scripted_search
+from search_cache import SearchCache
+
+ARTICLE = """
+<p>Solid-state batteries replace the liquid electrolyte with a solid ceramic or polymer layer.</p>
+<p>Manufacturers expect higher energy density and fewer fire risks than lithium-ion cells offer today.</p>
+<p>Pilot lines in Japan and Korea are scaling production of sulfide electrolytes for electric vehicles.</p>
+<p>Costs remain high because thin electrolyte layers are hard to make without cracks or defects.</p>
+<p>Analysts expect the first mass-market cars with these cells before the end of the decade.</p>
+"""
+
+PAGES = {
+    "/0": f"<html><head><title>Original</title></head><body><nav>Home | News</nav><article>{ARTICLE}</article>"
+          "<footer>Copyright Example News</footer></body></html>",
+    "/1": f"<html><head><title>Syndicated</title></head><body><header>Daily Wire</header><main>{ARTICLE}"
+          "<p>This article first appeared on Example News and is republished here.</p></main></body></html>",
+    "/2": """<html><head><title>Fusion</title></head><body><article>
+          <p>Fusion startups are testing high-temperature superconducting magnets for compact tokamaks.</p>
+          <p>Private funding has grown quickly while public programs build larger experimental reactors.</p>
+          <p>Tritium supply and materials that survive neutron damage remain open engineering problems.</p>
+          </article></body></html>""",
+}
+
+
+def fetcher():
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        page = PAGES.get(request.url.path)
+        if page is None:
+            return httpx.Response(404)
+        return httpx.Response(200, text=page, headers={"content-type": "text/html; charset=utf-8"})
+
+    page_fetcher = PageFetcher(cache=SearchCache(":memory:", table="pages"), transport=httpx.MockTransport(handler))
+    return page_fetcher, requests
+
+
+def test_normalize_url_drops_tracking_and_fragment():
+    assert (normalize_url("HTTPS://Example.com/a/?utm_source=x&id=3#top")
+            == normalize_url("https://example.com/a?id=3&fbclid=y") == "https://example.com/a?id=3")
+
+
+def test_copies_of_a_page_are_dropped():
+    page_fetcher, _ = fetcher()
+    documents = page_fetcher.fetch(["https://example.com/0", "https://example.com/1", "https://example.com/2"])
+    assert [document.title for document in documents] == ["Original", "Fusion"]
+    assert all("Home" not in document.text and "Copyright" not in document.text for document in documents)
+    assert page_fetcher.stats()["duplicates"] == 1
+    assert dedupe_documents(documents) == documents
+
+
+def test_pages_are_cached_and_failures_retried():
+    page_fetcher, requests = fetcher()
+    urls = ["https://example.com/0", "https://example.com/missing"]
+    assert len(page_fetcher.fetch(urls)) == 1
+    assert len(page_fetcher.fetch([url + "#again" for url in urls])) == 1
+    assert requests == ["/0", "/missing", "/missing"]
+    assert page_fetcher.stats()["failed"] == 2
+
+
+def test_attach_pages_adds_unique_pages_to_search_results():
+    page_fetcher, _ = fetcher()
+    results = attach_pages(scripted_search("solid-state batteries"), page_fetcher, count=3, tokens=200)
+    assert [page["link"] for page in results["pages"]] == ["https://example.com/0", "https://example.com/2"]
+    assert len(results["organic"]) == 5
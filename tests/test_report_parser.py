@@ -0,0 +1,35 @@
+from report_parser import INLINE_LATEX, MERMAID, TEXT, stable_prefix_length, tokenize
+
+PRICES = "Panels cost $5 to $10 per watt in 2010 and $0.30 today.\n\n"
+
+
+def test_prices_stay_text():
+    sections, open_at = tokenize(PRICES + "Tariffs added $2-$3 more.")
+    assert [section.kind for section in sections] == [TEXT]
+    assert open_at is None
+
+
+def test_inline_math_next_to_prices():
+    sections, _ = tokenize("A $5 kit computes $x^2 + 1$ and $E = mc^2$.")
+    assert [section.body for section in sections if section.kind == INLINE_LATEX] == ["x^2 + 1", "E = mc^2"]
+
+
+def test_streaming_does_not_stall_on_prices():
+    streamed = PRICES + "Storage now costs $120 per kWh.\n\nInstallers expect"
+    assert stable_prefix_length(streamed) == streamed.rindex("\n\n") + 2
+
+
+def test_streaming_waits_for_open_blocks():
+    math = PRICES + "The yield is $\\eta = P_"
+    assert stable_prefix_length(math) == len(PRICES)
+    assert tokenize(math)[1] == math.index("$\\eta")
+    diagram = PRICES + "Flow:\n\n```mermaid\ngraph TD\n\n    A --> B"
+    assert stable_prefix_length(diagram) == diagram.index("```mermaid")
+    sections, open_at = tokenize(diagram + "\n```\n")
+    assert open_at is None and sections[-2].kind == MERMAID
+
+
+def test_unclosed_dollar_on_a_finished_line_is_text():
+    content = "Budget in $USD was tight\n\nNext paragraph"
+    assert tokenize(content)[1] is None
+    assert stable_prefix_length(content) == content.index("Next")
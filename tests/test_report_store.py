@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+import report_store
+from conftest import Quiet
+from report_store import ReportStore, split_sections
+
+REPORT = """# Research Report: Fusion
+
+Intro text.
+
+## Magnets
+
+High-temperature superconducting magnets shrink tokamaks.
+
+```python
+## not a heading
+```
+
+## Funding
+
+Private funding for fusion startups keeps growing.
+"""
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(report_store, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_split_sections_ignores_headings_in_code():
+    sections = split_sections(REPORT)
+    assert [heading for heading, _ in sections] == ["", "Magnets", "Funding"]
+    assert "## not a heading" in sections[1][1]
+
+
+def test_stale_sections_are_refreshed_individually(clock):
+    store = ReportStore(":memory:", max_age=100)
+    store.save("Fusion", REPORT)
+    assert set(store.fresh_sections("fusion ")) == {"", "Magnets", "Funding"}
+
+    clock.value += 150
+    assert store.fresh_sections("Fusion") == {}
+    store.save("Fusion", REPORT.replace("keeps growing", "doubled"), refreshed={"Funding"})
+    assert set(store.fresh_sections("Fusion")) == {"Funding"}
+    assert "doubled" in store.load("Fusion").content
+
+
+def test_reports_are_kept_per_layout_and_params():
+    store = ReportStore(":memory:")
+    store.save("Fusion", REPORT, params={"model": "a"})
+    assert store.load("Fusion") is None
+    assert store.load("Fusion", "parallel", params={"model": "a"}) is None
+    assert store.load("Fusion", params={"model": "a"}).params == '{"model": "a"}'
+    store.save("Fusion", REPORT, params={"model": "a"})
+    assert store.stats() == {"reports": 1, "sections": 3}
+
+
+def test_search_ranks_sections_and_quotes_user_input():
+    store = ReportStore(":memory:")
+    report_id = store.save("Fusion", REPORT)
+    store.save("Batteries", "## Cells\n\nSolid-state cells avoid liquid electrolytes.\n")
+    hits = store.search("superconducting magnets")
+    assert [(hit["report_id"], hit["heading"]) for hit in hits] == [(report_id, "Magnets")]
+    assert "**superconducting**" in hits[0]["snippet"]
+    assert store.search('funding" OR NOT (') == []
+    assert store.search("  ") == []
+
+
+def test_parallel_pipeline_reuses_fresh_sections(replay_agents):
+    from pipeline import run_report_pipeline
+
+    agents, llm = replay_agents
+    store = ReportStore(":memory:")
+    first = run_report_pipeline("Fusion", Quiet(), agents, parallel=True, verbose=False, store=store)
+    calls = llm.calls
+    assert run_report_pipeline("Fusion", Quiet(), agents, parallel=True, verbose=False, store=store) == first
+    assert llm.calls == calls
+
+    store.max_age = 0
+    run_report_pipeline("Fusion", Quiet(), agents, parallel=True, verbose=False, store=store)
+    assert llm.calls == 2 * calls
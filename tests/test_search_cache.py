@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from search_cache import SearchCache, cache_key, cached_search_tool
+
+
+class StubSearch:
+    """Search backend that answers from memory and counts its calls"""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, query, **params):
+        self.calls.append(query)
+        if self.fail:
+            raise ConnectionError("search backend unavailable")
+        return {"organic": [{"title": f"Result for {query}", "link": "https://example.com/1"}]}
+
+
+def test_equivalent_queries_share_a_key():
+    assert cache_key("Solid-State  Batteries ", n_results=5) == cache_key("solid-state batteries", n_results=5)
+    assert cache_key("solid-state batteries", n_results=5) != cache_key("solid-state batteries", n_results=10)
+
+
+def test_entries_expire_after_ttl():
+    cache = SearchCache(":memory:", ttl=0.05)
+    cache.set("fusion", {"organic": []})
+    assert cache.get("fusion") == {"organic": []}
+    time.sleep(0.1)
+    assert cache.get("fusion") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = SearchCache(":memory:", max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1
+    time.sleep(0.01)
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_repeated_query_across_agents_hits_the_cache():
+    cache = SearchCache(":memory:")
+    backend = StubSearch()
+    researcher_tool = cached_search_tool(cache=cache, backend=backend)
+    writer_tool = cached_search_tool(cache=cache, backend=backend)
+    first = researcher_tool._run(search_query="Quantum sensors")
+    assert writer_tool._run(search_query="quantum  sensors") == first
+    assert backend.calls == ["Quantum sensors"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_failed_calls_are_not_cached():
+    cache = SearchCache(":memory:")
+    with pytest.raises(ConnectionError):
+        cache.fetch("grid storage", StubSearch(fail=True))
+    assert cache.fetch("grid storage", lambda query, **params: None) is None
+    backend = StubSearch()
+    assert cache.fetch("grid storage", backend)["organic"]
+    assert backend.calls == ["grid storage"]
+    assert cache.stats()["entries"] == 1
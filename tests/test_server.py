@@ -0,0 +1,26 @@
+import pytest
+from starlette.requests import Request
+
+import server
+
+
+def make_request(headers=(), client=("203.0.113.7", 5000)):
+    return Request({"type": "http", "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+                    "client": client})
+
+
+def test_user_headers_are_ignored_without_a_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(server, "TRUSTED_PROXY", False)
+    request = make_request([("X-Forwarded-For", "198.51.100.1")])
+    assert server.request_user(request, "admin") == "203.0.113.7"
+    assert server.request_user(make_request(client=None)) == ""
+
+
+@pytest.mark.parametrize("headers, x_user, user", [
+    ([("X-Forwarded-For", "198.51.100.1, 10.0.0.2")], "ana", "ana"),
+    ([("X-Forwarded-For", "198.51.100.1, 10.0.0.2")], None, "198.51.100.1"),
+    ([], None, "203.0.113.7"),
+])
+def test_trusted_proxy_headers_name_the_user(monkeypatch, headers, x_user, user):
+    monkeypatch.setattr(server, "TRUSTED_PROXY", True)
+    assert server.request_user(make_request(headers), x_user) == user